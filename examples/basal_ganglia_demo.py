@@ -5,13 +5,17 @@ Demonstrates competitive action selection using the basal ganglia circuitry.
 Shows how different action utilities lead to winner-take-all selection via
 the direct and indirect pathways.
 
+All scenarios are scheduled up front and simulated in a single run, so the
+demo also works on Brian2's standalone device.
+
 Usage:
-    python examples/basal_ganglia_demo.py
+    python examples/basal_ganglia_demo.py [--device cpp_standalone]
 """
+import argparse
+import logging
 import os
 import sys
-import numpy as np
-from brian2 import ms
+from brian2 import ms, StateMonitor, prefs
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -19,7 +23,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from scripts.basal_ganglia import BasalGangliaActionSelection
 
 
-def main():
+def main(device="runtime"):
+    # Reuse generated Cython code across invocations of the demo, cached in
+    # the repository rather than wherever the demo is started from
+    prefs.codegen.runtime.cython.cache_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".brian2_cache"
+    )
+    standalone = device == "cpp_standalone"
+    # Show the basal ganglia module's progress messages
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("=" * 70)
     print("BASAL GANGLIA ACTION SELECTION DEMONSTRATION")
     print("=" * 70)
@@ -32,7 +45,7 @@ def main():
     )
     
     print("Step 1: Loading basal ganglia template...")
-    bg = BasalGangliaActionSelection(template_path)
+    bg = BasalGangliaActionSelection(template_path, standalone=standalone, verbose=True)
     print()
     
     # Register three competitive actions
@@ -42,116 +55,67 @@ def main():
     bg.register_action("GRASP", list(range(60, 90)), list(range(60, 90)))
     print()
     
-    # Scenario 1: Clear winner
-    print("=" * 70)
-    print("SCENARIO 1: Clear Winner (REACH_LEFT has highest utility)")
-    print("=" * 70)
-    
-    bg.reset()
-    bg.set_action_utility("REACH_LEFT", 0.9)
-    bg.set_action_utility("REACH_RIGHT", 0.3)
-    bg.set_action_utility("GRASP", 0.2)
-    
-    print("Utilities set:")
-    print("  - REACH_LEFT:  0.9")
-    print("  - REACH_RIGHT: 0.3")
-    print("  - GRASP:       0.2")
-    print()
-    
-    # Run simulation
-    print("Running basal ganglia network for 200ms...")
-    bg.network.run(200 * ms)
-    
-    selected, confidence = bg.get_selected_action()
-    print(f"\n✓ Selected action: {selected}")
-    print(f"  Confidence: {confidence:.2%}")
-    print()
-    
-    # Scenario 2: Competition
-    print("=" * 70)
-    print("SCENARIO 2: Close Competition (REACH_RIGHT vs GRASP)")
-    print("=" * 70)
-    
-    bg.reset()
-    bg.set_action_utility("REACH_LEFT", 0.2)
-    bg.set_action_utility("REACH_RIGHT", 0.7)
-    bg.set_action_utility("GRASP", 0.6)
-    
-    print("Utilities set:")
-    print("  - REACH_LEFT:  0.2")
-    print("  - REACH_RIGHT: 0.7")
-    print("  - GRASP:       0.6")
-    print()
-    
-    print("Running basal ganglia network for 200ms...")
-    bg.network.run(200 * ms)
-    
-    selected, confidence = bg.get_selected_action()
-    print(f"\n✓ Selected action: {selected}")
-    print(f"  Confidence: {confidence:.2%}")
-    print()
-    
-    # Scenario 3: Equal utilities (ambiguous)
-    print("=" * 70)
-    print("SCENARIO 3: Ambiguous Choice (All equal utilities)")
-    print("=" * 70)
-    
+    # Each scenario is a list of (utilities, duration) phases; scenario 4
+    # changes utilities halfway through
+    scenarios = [
+        ("SCENARIO 1: Clear Winner (REACH_LEFT has highest utility)",
+         [({"REACH_LEFT": 0.9, "REACH_RIGHT": 0.3, "GRASP": 0.2}, 200 * ms)]),
+        ("SCENARIO 2: Close Competition (REACH_RIGHT vs GRASP)",
+         [({"REACH_LEFT": 0.2, "REACH_RIGHT": 0.7, "GRASP": 0.6}, 200 * ms)]),
+        ("SCENARIO 3: Ambiguous Choice (All equal utilities)",
+         [({"REACH_LEFT": 0.5, "REACH_RIGHT": 0.5, "GRASP": 0.5}, 200 * ms)]),
+        ("SCENARIO 4: Dynamic Utility Changes",
+         [({"REACH_LEFT": 0.8, "REACH_RIGHT": 0.3, "GRASP": 0.2}, 100 * ms),
+          ({"REACH_LEFT": 0.2, "REACH_RIGHT": 0.3, "GRASP": 0.9}, 100 * ms)]),
+    ]
+    step = 100 * ms
+    
+    # Expand all phases into one utility schedule with 100 ms resolution
+    schedule = {name: [] for name in bg.action_pools}
+    for _, phases in scenarios:
+        for utilities, duration in phases:
+            for name, utility in utilities.items():
+                schedule[name].extend([utility] * int(round(duration / step)))
+    
+    print("Step 3: Scheduling scenarios...")
     bg.reset()
-    bg.set_action_utility("REACH_LEFT", 0.5)
-    bg.set_action_utility("REACH_RIGHT", 0.5)
-    bg.set_action_utility("GRASP", 0.5)
-    
-    print("Utilities set:")
-    print("  - REACH_LEFT:  0.5")
-    print("  - REACH_RIGHT: 0.5")
-    print("  - GRASP:       0.5")
-    print()
-    
-    print("Running basal ganglia network for 200ms...")
-    bg.network.run(200 * ms)
-    
-    selected, confidence = bg.get_selected_action()
-    print(f"\n✓ Selected action: {selected}")
-    print(f"  Confidence: {confidence:.2%}")
-    print("  (Note: With equal utilities, selection may vary due to noise)")
+    bg.schedule_action_utilities(schedule, interval=step)
+    thal_mon = StateMonitor(bg.thalamus, 'v', record=True, dt=1 * ms, when='end')
+    bg.network.add(thal_mon)
+    
+    # Run every scenario in a single simulation
+    total = sum(duration for _, phases in scenarios for _, duration in phases)
+    print(f"Running basal ganglia network for {total / ms:.0f}ms "
+          f"({len(scenarios)} scenarios in a single run)...")
+    bg.network.run(total)
+    if standalone:
+        bg.template.build_standalone(directory="output")
     print()
     
-    # Demonstrate dynamic switching
-    print("=" * 70)
-    print("SCENARIO 4: Dynamic Utility Changes")
-    print("=" * 70)
-    
-    bg.reset()
-    
-    print("Initial utilities:")
-    bg.set_action_utility("REACH_LEFT", 0.8)
-    bg.set_action_utility("REACH_RIGHT", 0.3)
-    bg.set_action_utility("GRASP", 0.2)
-    print("  - REACH_LEFT:  0.8")
-    print("  - REACH_RIGHT: 0.3")
-    print("  - GRASP:       0.2")
-    
-    print("\nRunning for 100ms...")
-    bg.network.run(100 * ms)
-    selected1, conf1 = bg.get_selected_action()
-    print(f"Selected: {selected1} (confidence: {conf1:.2%})")
-    
-    print("\nChanging utilities (favoring GRASP)...")
-    bg.set_action_utility("REACH_LEFT", 0.2)
-    bg.set_action_utility("REACH_RIGHT", 0.3)
-    bg.set_action_utility("GRASP", 0.9)
-    print("  - REACH_LEFT:  0.2")
-    print("  - REACH_RIGHT: 0.3")
-    print("  - GRASP:       0.9")
-    
-    print("\nRunning for another 100ms...")
-    bg.network.run(100 * ms)
-    selected2, conf2 = bg.get_selected_action()
-    print(f"Selected: {selected2} (confidence: {conf2:.2%})")
-    
-    if selected1 != selected2:
-        print("\n✓ Action selection switched based on utility changes!")
-    print()
+    elapsed = 0 * ms
+    for title, phases in scenarios:
+        print("=" * 70)
+        print(title)
+        print("=" * 70)
+        
+        selections = []
+        for utilities, duration in phases:
+            print("Utilities:")
+            for name, utility in utilities.items():
+                print(f"  - {name + ':':13s}{utility}")
+            
+            # Thalamus state at the end of the phase
+            elapsed += duration
+            sample = int(round(elapsed / ms)) - 1
+            selected, confidence = bg.get_selected_action(thal_activity=thal_mon.v[:, sample])
+            selections.append(selected)
+            print(f"\n✓ Selected action: {selected}")
+            print(f"  Confidence: {confidence:.2%}")
+            print()
+        
+        if len(selections) > 1 and selections[0] != selections[-1]:
+            print("✓ Action selection switched based on utility changes!")
+            print()
     
     # Summary
     print("=" * 70)
@@ -178,4 +142,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Basal ganglia action selection demo")
+    parser.add_argument("--device", choices=["runtime", "cpp_standalone"],
+                        default="runtime",
+                        help="Brian2 device (cpp_standalone needs a C++ compiler)")
+    args = parser.parse_args()
+    main(device=args.device)
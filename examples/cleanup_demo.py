@@ -28,13 +28,26 @@ def main():
     print("=" * 70)
     print()
 
-    # Set random seed for reproducibility
+    # Set random seed for reproducibility (vocabulary vectors use the global
+    # NumPy RNG; all noise in this demo comes from a local Generator)
     np.random.seed(42)
+    rng = np.random.default_rng(42)
+
+    concepts = ["RED", "BLUE", "GREEN", "CIRCLE", "SQUARE"]
+    noise_levels = [0.3, 0.5, 0.8]
+
+    # Draw the noise for every test up front: one row per TEST 1 noise
+    # level, one per TEST 2 concept and one for TEST 3
+    noise_pool = rng.standard_normal(
+        (len(noise_levels) + len(concepts) + 1, 50), dtype=np.float32
+    )
+    level_noise, concept_noise, trajectory_noise = np.split(
+        noise_pool, [len(noise_levels), len(noise_levels) + len(concepts)]
+    )
 
     # Create vocabulary with semantic concepts
     print("[VOCABULARY] Creating vocabulary with 5 semantic concepts...")
     vocab = SemanticVocabulary(dimensionality=50)
-    concepts = ["RED", "BLUE", "GREEN", "CIRCLE", "SQUARE"]
     for concept in concepts:
         vocab.add(concept)
     print(f">>> Added {len(concepts)} concepts: {', '.join(concepts)}")
@@ -54,9 +67,8 @@ def main():
     print("-" * 70)
 
     test_concept = "RED"
-    noise_levels = [0.3, 0.5, 0.8]
 
-    for noise_level in noise_levels:
+    for noise_level, noise_draw in zip(noise_levels, level_noise):
         print(f"\n[NOISE LEVEL] {noise_level:.1f}")
         print("-" * 40)
 
@@ -64,7 +76,7 @@ def main():
         original_vec = vocab.get(test_concept)
 
         # Add noise
-        noise = np.random.randn(50) * noise_level
+        noise = noise_draw * noise_level
         noisy_vec = original_vec + noise
         noisy_vec = noisy_vec / np.linalg.norm(noisy_vec)  # Normalize
 
@@ -107,32 +119,26 @@ def main():
     print("=" * 70)
     print()
 
-    # Test cleanup on all concepts
+    # Test cleanup on all concepts as one batch
     moderate_noise = 0.5
-    success_count = 0
-
-    for concept in concepts:
-        original_vec = vocab.get(concept)
 
-        # Add noise
-        noise = np.random.randn(50) * moderate_noise
-        noisy_vec = original_vec + noise
-        noisy_vec = noisy_vec / np.linalg.norm(noisy_vec)
+    # Add noise to every concept at once
+    originals = np.stack([vocab.get(concept) for concept in concepts])
+    noisy_batch = originals + concept_noise * moderate_noise
+    noisy_batch = noisy_batch / np.linalg.norm(noisy_batch, axis=1, keepdims=True)
 
-        # Cleanup
-        cleaned_vec = cleanup.cleanup(noisy_vec)
+    # Cleanup and find nearest matches for the whole batch
+    cleaned_batch = cleanup.cleanup_batch(noisy_batch)
+    nearest_names, nearest_sims = cleanup.find_nearest_match_batch(cleaned_batch)
 
-        # Find nearest match
-        nearest_name, nearest_sim = cleanup.find_nearest_match(cleaned_vec)
-
-        # Check if cleanup recovered correct concept
-        correct = nearest_name == concept
-        if correct:
-            success_count += 1
-            status = "[OK]"
-        else:
-            status = "[FAIL]"
+    # Check if cleanup recovered correct concepts
+    correct = np.array(nearest_names) == np.array(concepts)
+    success_count = int(correct.sum())
 
+    for concept, nearest_name, nearest_sim, ok in zip(
+        concepts, nearest_names, nearest_sims, correct
+    ):
+        status = "[OK]" if ok else "[FAIL]"
         print(f"  {status} {concept:10s} -> {nearest_name:10s} ({nearest_sim:.2%} similarity)")
 
     print()
@@ -146,7 +152,7 @@ def main():
     print()
 
     test_vec = vocab.get("BLUE")
-    noisy = test_vec + 0.6 * np.random.randn(50)
+    noisy = test_vec + 0.6 * trajectory_noise[0]
     noisy = noisy / np.linalg.norm(noisy)
 
     cleaned, trajectory, n_iters = cleanup.cleanup(noisy, return_trajectory=True)
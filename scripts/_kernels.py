@@ -0,0 +1,646 @@
+"""
+Compiled Kernels for Semantic Pointer Operations
+
+Hot loops used by semantic_algebra (and the server's network builder),
+compiled with Numba when it is installed. Every kernel has a NumPy
+fallback with identical results, so Numba stays an optional dependency;
+for the random kernels (connectivity, spike patterns) the fallback draws
+from the same distribution but a different stream. Batched cleanup can additionally
+run under JAX (optional, no fallback: callers check HAVE_JAX).
+
+Author: Zae Project
+License: MIT
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    njit = prange = None
+    HAVE_NUMBA = False
+
+try:
+    import jax
+    import jax.numpy as jnp
+    HAVE_JAX = True
+except ImportError:  # pragma: no cover - exercised only with jax
+    jax = jnp = None
+    HAVE_JAX = False
+
+
+# =============================================================================
+# Vector Primitives
+# =============================================================================
+
+if HAVE_NUMBA:
+
+    @njit(cache=True, fastmath=True)
+    def dot(a, b):
+        """
+        Dot product of two vectors in a single loop.
+
+        Args:
+            a: First vector (n,)
+            b: Second vector (n,)
+
+        Returns:
+            Scalar dot product
+        """
+        s = 0.0
+        for i in range(a.shape[0]):
+            s += a[i] * b[i]
+        return s
+
+    @njit(cache=True, fastmath=True)
+    def normalize_inplace(x):
+        """
+        Scale x to unit length in place; near-zero vectors are left as is.
+
+        One pass accumulates the squared norm in a register, a second
+        multiplies by its reciprocal; no temporaries are allocated.
+
+        Args:
+            x: Vector (n,), overwritten
+
+        Returns:
+            x
+        """
+        norm_sq = 0.0
+        for i in range(x.shape[0]):
+            norm_sq += x[i] * x[i]
+        norm = np.sqrt(norm_sq)
+
+        if norm > 1e-10:
+            inv = 1.0 / norm
+            for i in range(x.shape[0]):
+                x[i] *= inv
+        return x
+
+    @njit(cache=True, fastmath=True)
+    def normalize_rows_inplace(x):
+        """
+        Scale every row of x to unit length in place (near-zero rows kept).
+
+        Args:
+            x: Stacked vectors (m × n), overwritten
+
+        Returns:
+            x
+        """
+        for k in range(x.shape[0]):
+            normalize_inplace(x[k])
+        return x
+
+    @njit(cache=True, fastmath=True)
+    def superpose(vectors):
+        """
+        Sum the rows of vectors and normalize, without temporaries.
+
+        Args:
+            vectors: Stacked vectors (m × n)
+
+        Returns:
+            Normalized sum (n,); returned unnormalized if near zero
+        """
+        m, n = vectors.shape
+        out = np.zeros(n, dtype=vectors.dtype)
+        for k in range(m):
+            for i in range(n):
+                out[i] += vectors[k, i]
+
+        norm_sq = 0.0
+        for i in range(n):
+            norm_sq += out[i] * out[i]
+        norm = np.sqrt(norm_sq)
+        if norm > 1e-10:
+            for i in range(n):
+                out[i] /= norm
+        return out
+
+else:
+
+    def dot(a, b):
+        """NumPy fallback for the compiled dot kernel."""
+        return np.dot(a, b)
+
+    def _norm(x):
+        """L2 norm of a vector as sqrt(x . x), skipping np.linalg.norm's dispatch."""
+        return math.sqrt(float(np.dot(x, x)))
+
+    def normalize_inplace(x):
+        """NumPy fallback for the compiled normalize_inplace kernel."""
+        norm = _norm(x)
+        if norm > 1e-10:
+            x *= 1.0 / norm
+        return x
+
+    def normalize_rows_inplace(x):
+        """NumPy fallback for the compiled normalize_rows_inplace kernel."""
+        norms = np.linalg.norm(x, axis=-1, keepdims=True)
+        return np.divide(x, norms, out=x, where=norms > 1e-10)
+
+    def superpose(vectors):
+        """NumPy fallback for the compiled superpose kernel."""
+        return normalize_inplace(vectors.sum(axis=0))
+
+
+# =============================================================================
+# Cleanup Memory Dynamics
+# =============================================================================
+
+if HAVE_NUMBA:
+
+    @njit(cache=True, fastmath=True)
+    def cleanup_trajectory(weights, x0, threshold, max_iter):
+        """
+        Settle x0 under x <- normalize(tanh(W @ x)), recording every state.
+
+        Args:
+            weights: Recurrent weight matrix (dim × dim), C-contiguous
+            x0: Initial state (dim,), same dtype as weights
+            threshold: Convergence threshold on ||x_new - x||
+            max_iter: Maximum number of iterations
+
+        Returns:
+            Tuple of (final_state, trajectory, n_iterations) where
+            trajectory has n_iterations + 1 rows (initial state included)
+        """
+        dim = x0.shape[0]
+        trajectory = np.empty((max_iter + 1, dim), dtype=x0.dtype)
+        trajectory[0] = x0
+        x = trajectory[0]
+
+        for it in range(max_iter):
+            x_new = trajectory[it + 1]
+
+            # x_new = tanh(W @ x), accumulating the squared norm on the way
+            norm_sq = 0.0
+            for i in range(dim):
+                acc = 0.0
+                for j in range(dim):
+                    acc += weights[i, j] * x[j]
+                y = np.tanh(acc)
+                x_new[i] = y
+                norm_sq += y * y
+
+            # Second pass: normalize and accumulate the change in one sweep
+            norm = np.sqrt(norm_sq)
+            if norm > 1e-10:
+                inv = 1.0 / norm
+            else:
+                # Degenerate case: reset to the normalized initial state
+                inv = 1.0 / np.sqrt(np.sum(x0 * x0))
+                for i in range(dim):
+                    x_new[i] = x0[i]
+
+            change_sq = 0.0
+            for i in range(dim):
+                y = x_new[i] * inv
+                x_new[i] = y
+                d = y - x[i]
+                change_sq += d * d
+
+            if np.sqrt(change_sq) < threshold:
+                return x_new.copy(), trajectory[:it + 2], it + 1
+
+            x = x_new
+
+        return x.copy(), trajectory, max_iter
+
+    @njit(cache=True, fastmath=True)
+    def settle(weights, x0, threshold, max_iter):
+        """
+        Settle x0 under x <- normalize(tanh(W @ x)) without recording states.
+
+        Same dynamics as cleanup_trajectory, alternating between two
+        preallocated buffers. Each iteration makes two passes: matvec, tanh
+        and squared norm fused in the first, normalization and the change
+        norm fused in the second.
+
+        Args:
+            weights: Recurrent weight matrix (dim × dim), C-contiguous
+            x0: Initial state (dim,), same dtype as weights
+            threshold: Convergence threshold on ||x_new - x||
+            max_iter: Maximum number of iterations
+
+        Returns:
+            Tuple of (final_state, n_iterations)
+        """
+        dim = x0.shape[0]
+        x = x0.copy()
+        x_new = np.empty_like(x0)
+
+        for it in range(max_iter):
+            norm_sq = 0.0
+            for i in range(dim):
+                acc = 0.0
+                for j in range(dim):
+                    acc += weights[i, j] * x[j]
+                y = np.tanh(acc)
+                x_new[i] = y
+                norm_sq += y * y
+
+            norm = np.sqrt(norm_sq)
+            if norm > 1e-10:
+                inv = 1.0 / norm
+            else:
+                inv = 1.0 / np.sqrt(np.sum(x0 * x0))
+                for i in range(dim):
+                    x_new[i] = x0[i]
+
+            change_sq = 0.0
+            for i in range(dim):
+                y = x_new[i] * inv
+                x_new[i] = y
+                d = y - x[i]
+                change_sq += d * d
+
+            x, x_new = x_new, x
+            if np.sqrt(change_sq) < threshold:
+                return x, it + 1
+
+        return x, max_iter
+
+else:
+
+    def cleanup_trajectory(weights, x0, threshold, max_iter):
+        """NumPy fallback for the compiled cleanup_trajectory kernel."""
+        trajectory = np.empty((max_iter + 1, x0.shape[0]), dtype=x0.dtype)
+        trajectory[0] = x0
+        x = trajectory[0]
+
+        for it in range(max_iter):
+            x_new = trajectory[it + 1]
+            np.tanh(weights @ x, out=x_new)
+
+            norm = _norm(x_new)
+            if norm > 1e-10:
+                x_new /= norm
+            else:
+                x_new[:] = x0 / _norm(x0)
+
+            if _norm(x_new - x) < threshold:
+                return x_new.copy(), trajectory[:it + 2], it + 1
+
+            x = x_new
+
+        return x.copy(), trajectory, max_iter
+
+    def settle(weights, x0, threshold, max_iter):
+        """NumPy fallback for the compiled settle kernel."""
+        x = x0.copy()
+        x_new = np.empty_like(x0)
+
+        for it in range(max_iter):
+            np.tanh(weights @ x, out=x_new)
+
+            norm = _norm(x_new)
+            if norm > 1e-10:
+                x_new /= norm
+            else:
+                x_new[:] = x0 / _norm(x0)
+
+            change = _norm(x_new - x)
+            x, x_new = x_new, x
+            if change < threshold:
+                return x, it + 1
+
+        return x, max_iter
+
+
+# =============================================================================
+# Batched Cleanup (JAX)
+# =============================================================================
+
+if HAVE_JAX:
+
+    @jax.jit
+    def settle_batch_jax(weights, x0, threshold, max_iter):
+        """
+        Settle every row of x0 under x <- normalize(tanh(W @ x)) in one XLA loop.
+
+        Rows freeze individually once their change drops below threshold,
+        matching CleanupMemory.cleanup_batch; the loop ends when no row is
+        active or max_iter is reached.
+
+        Args:
+            weights: Recurrent weight matrix (dim × dim)
+            x0: Initial states (batch × dim)
+            threshold: Convergence threshold on ||x_new - x|| per row
+            max_iter: Maximum number of iterations
+
+        Returns:
+            Final states (batch × dim) as a JAX array
+        """
+        reset = x0 / jnp.linalg.norm(x0, axis=1, keepdims=True)
+
+        def cond(state):
+            it, _, active = state
+            return (it < max_iter) & jnp.any(active)
+
+        def body(state):
+            it, x, active = state
+            y = jnp.tanh(x @ weights.T)
+            norms = jnp.linalg.norm(y, axis=1, keepdims=True)
+            # Degenerate rows reset to their normalized initial state
+            y = jnp.where(norms > 1e-10, y / norms, reset)
+            change = jnp.linalg.norm(y - x, axis=1)
+            x = jnp.where(active[:, None], y, x)
+            return it + 1, x, active & (change >= threshold)
+
+        active = jnp.ones(x0.shape[0], dtype=bool)
+        _, x, _ = jax.lax.while_loop(cond, body, (0, x0, active))
+        return x
+
+else:
+
+    def settle_batch_jax(weights, x0, threshold, max_iter):
+        """Placeholder without JAX; callers check HAVE_JAX first."""
+        raise ImportError("settle_batch_jax requires JAX to be installed")
+
+
+# =============================================================================
+# Similarity Search
+# =============================================================================
+
+if HAVE_NUMBA:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def nearest_match(dictionary, v):
+        """
+        Find the dictionary row with the largest dot product with v.
+
+        Rows are scored in parallel; ties resolve to the first row.
+
+        Args:
+            dictionary: Stacked vectors (n × dim), C-contiguous
+            v: Query vector (dim,), same dtype as dictionary
+
+        Returns:
+            Tuple of (row_index, similarity)
+        """
+        n, dim = dictionary.shape
+        sims = np.empty(n, dtype=dictionary.dtype)
+        for i in prange(n):
+            s = 0.0
+            for k in range(dim):
+                s += dictionary[i, k] * v[k]
+            sims[i] = s
+        idx = sims.argmax()
+        return idx, sims[idx]
+
+else:
+
+    def nearest_match(dictionary, v):
+        """NumPy fallback for the compiled nearest_match kernel."""
+        sims = dictionary @ v
+        idx = sims.argmax()
+        return idx, sims[idx]
+
+
+# =============================================================================
+# Clustered Connectivity
+# =============================================================================
+
+def cluster_index_table(clusters):
+    """
+    Group neuron indices by cluster id.
+
+    One stable sort replaces a full scan of the array per cluster.
+
+    Args:
+        clusters: Cluster id per neuron (n,)
+
+    Returns:
+        List of (cluster_id, indices) pairs in ascending id order, where
+        indices is an ascending int64 array of the neurons in that cluster
+    """
+    clusters = np.asarray(clusters)
+    order = np.argsort(clusters, kind="stable")
+    ids, starts = np.unique(clusters[order], return_index=True)
+    return list(zip(ids, np.split(order, starts[1:])))
+
+
+def cluster_connect_blocks(src_clusters, tgt_clusters, prob_local,
+                           prob_distant, no_self, seed):
+    """
+    Draw clustered random connectivity block by block with NumPy.
+
+    Same distribution as cluster_connect, sampled per (source cluster,
+    target cluster) block instead of per pair: the number of synapses in a
+    block is drawn from Binomial(block_pairs, p) and that many distinct
+    pairs are chosen without replacement. Random draws scale with the
+    number of synapses rather than n_src × n_tgt.
+
+    Args:
+        src_clusters: Cluster id per source neuron (n_src,)
+        tgt_clusters: Cluster id per target neuron (n_tgt,)
+        prob_local: Connection probability within a cluster
+        prob_distant: Connection probability across clusters
+        no_self: Skip pairs with a == b (source and target are one group)
+        seed: Seed for the generator; equal seeds give equal connectivity
+
+    Returns:
+        Tuple of (i, j) int32 index arrays, sorted by source
+    """
+    rng = np.random.default_rng(seed)
+    src_table = cluster_index_table(src_clusters)
+    if tgt_clusters is src_clusters:
+        tgt_table = src_table
+    else:
+        tgt_table = cluster_index_table(tgt_clusters)
+
+    rows_i, rows_j = [], []
+    for ca, A in src_table:
+        for cb, B in tgt_table:
+            p = prob_local if ca == cb else prob_distant
+            # Within a shared cluster of one group, A and B are the same
+            # neurons: sample from the block without its diagonal
+            diagonal = no_self and ca == cb
+            n_cols = len(B) - 1 if diagonal else len(B)
+            n_pairs = len(A) * n_cols
+            if p <= 0 or n_pairs <= 0:
+                continue
+
+            k = rng.binomial(n_pairs, min(p, 1.0))
+            flat = rng.choice(n_pairs, size=k, replace=False)
+            a, b = np.divmod(flat, n_cols)
+            if diagonal:
+                b += b >= a  # Skip over column a
+            rows_i.append(A[a])
+            rows_j.append(B[b])
+
+    if not rows_i:
+        return np.empty(0, np.int32), np.empty(0, np.int32)
+    i = np.concatenate(rows_i).astype(np.int32)
+    j = np.concatenate(rows_j).astype(np.int32)
+    order = np.argsort(i, kind="stable")
+    return i[order], j[order]
+
+
+if HAVE_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def _cluster_connect_rows(src_clusters, tgt_order, tgt_ids, tgt_starts,
+                              prob_local, prob_distant, no_self, seed):
+        """
+        Draw each source row's synapses by geometric skipping per cluster.
+
+        Targets are visited cluster by cluster through tgt_order. Within a
+        cluster every pair shares one probability p, so the gap to the
+        next connected target is Geometric(p) and only connected targets
+        are visited. Rows run in parallel in two passes: the first counts
+        each row's connections, the second replays the same draws (every
+        row reseeds from seed + row) and writes them at the row's offset.
+        """
+        n_src = src_clusters.shape[0]
+        n_blocks = tgt_ids.shape[0]
+
+        counts = np.zeros(n_src + 1, dtype=np.int64)
+        for a in prange(n_src):
+            np.random.seed(seed + a)
+            c = 0
+            for blk in range(n_blocks):
+                if src_clusters[a] == tgt_ids[blk]:
+                    p = prob_local
+                else:
+                    p = prob_distant
+                if p <= 0.0:
+                    continue
+                p = min(p, 1.0)
+                k = tgt_starts[blk] - 1
+                while True:
+                    k += np.random.geometric(p)
+                    if k >= tgt_starts[blk + 1]:
+                        break
+                    if no_self and tgt_order[k] == a:
+                        continue
+                    c += 1
+            counts[a + 1] = c
+        offsets = np.cumsum(counts)
+
+        out_i = np.empty(offsets[n_src], dtype=np.int32)
+        out_j = np.empty(offsets[n_src], dtype=np.int32)
+        for a in prange(n_src):
+            np.random.seed(seed + a)
+            w = offsets[a]
+            for blk in range(n_blocks):
+                if src_clusters[a] == tgt_ids[blk]:
+                    p = prob_local
+                else:
+                    p = prob_distant
+                if p <= 0.0:
+                    continue
+                p = min(p, 1.0)
+                k = tgt_starts[blk] - 1
+                while True:
+                    k += np.random.geometric(p)
+                    if k >= tgt_starts[blk + 1]:
+                        break
+                    if no_self and tgt_order[k] == a:
+                        continue
+                    out_i[w] = a
+                    out_j[w] = tgt_order[k]
+                    w += 1
+        return out_i, out_j
+
+    def cluster_connect(src_clusters, tgt_clusters, prob_local, prob_distant,
+                        no_self, seed):
+        """
+        Draw clustered random connectivity without an (n_src × n_tgt) mask.
+
+        Pair (a, b) is connected with prob_local when both neurons share a
+        cluster id and prob_distant otherwise. Targets are grouped by
+        cluster once; each source row then jumps between connected
+        targets with geometric gaps in a parallel Numba kernel, so random
+        draws and memory scale with the number of synapses rather than
+        n_src × n_tgt.
+
+        Args:
+            src_clusters: Cluster id per source neuron (n_src,)
+            tgt_clusters: Cluster id per target neuron (n_tgt,)
+            prob_local: Connection probability within a cluster
+            prob_distant: Connection probability across clusters
+            no_self: Skip pairs with a == b (source and target are one group)
+            seed: Base seed; equal seeds give equal connectivity
+
+        Returns:
+            Tuple of (i, j) int32 index arrays, sorted by source
+        """
+        src_clusters = np.asarray(src_clusters, dtype=np.float64)
+        tgt_clusters = np.asarray(tgt_clusters, dtype=np.float64)
+        tgt_order = np.argsort(tgt_clusters, kind="stable")
+        tgt_ids, starts = np.unique(tgt_clusters[tgt_order], return_index=True)
+        tgt_starts = np.append(starts, len(tgt_clusters)).astype(np.int64)
+        return _cluster_connect_rows(
+            src_clusters, tgt_order.astype(np.int64), tgt_ids, tgt_starts,
+            float(prob_local), float(prob_distant), bool(no_self), int(seed)
+        )
+
+else:
+
+    def cluster_connect(src_clusters, tgt_clusters, prob_local, prob_distant,
+                        no_self, seed):
+        """NumPy fallback for the compiled cluster_connect kernel."""
+        return cluster_connect_blocks(
+            src_clusters, tgt_clusters, prob_local, prob_distant, no_self, seed
+        )
+
+
+# =============================================================================
+# Spike Patterns
+# =============================================================================
+
+if HAVE_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def poisson_spike_pattern(n, duration, rate, seed):
+        """
+        Draw a Poisson spike pattern for n neurons, ordered by spike time.
+
+        Neurons are processed in parallel in two passes: the first draws
+        each neuron's spike count, the second replays the count (every
+        neuron reseeds from seed + neuron) and writes its uniform spike
+        times at the neuron's offset. A single stable argsort then orders
+        the flat arrays by time.
+
+        Args:
+            n: Number of neurons
+            duration: Duration in seconds
+            rate: Average firing rate in Hz
+            seed: Base seed; equal seeds give equal patterns
+
+        Returns:
+            Tuple of (neuron_ids, times) arrays, sorted by time
+        """
+        counts = np.zeros(n + 1, dtype=np.int64)
+        for a in prange(n):
+            np.random.seed(seed + a)
+            counts[a + 1] = np.random.poisson(rate * duration)
+        offsets = np.cumsum(counts)
+
+        ids = np.empty(offsets[n], dtype=np.int64)
+        times = np.empty(offsets[n], dtype=np.float64)
+        for a in prange(n):
+            np.random.seed(seed + a)
+            np.random.poisson(rate * duration)
+            for k in range(offsets[a], offsets[a + 1]):
+                ids[k] = a
+                times[k] = np.random.uniform(0.0, duration)
+        order = np.argsort(times, kind="mergesort")
+        return ids[order], times[order]
+
+else:
+
+    def poisson_spike_pattern(n, duration, rate, seed):
+        """NumPy fallback for the compiled poisson_spike_pattern kernel."""
+        rng = np.random.default_rng(seed)
+        counts = rng.poisson(rate * duration, size=n)
+        times = rng.uniform(0.0, duration, counts.sum())
+        ids = np.repeat(np.arange(n, dtype=np.int64), counts)
+        order = np.argsort(times, kind="stable")
+        return ids[order], times[order]
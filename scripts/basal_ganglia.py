@@ -12,16 +12,50 @@ References:
     Eliasmith, C. (2013). How to Build a Brain: A Neural Architecture for
     Biological Cognition. Oxford University Press.
 """
+import functools
 import json
+import logging
+import os
 from typing import Dict, List, Optional, Tuple
 import numpy as np
-from brian2 import NeuronGroup, Synapses, Network, ms, Hz
+from brian2 import (
+    NeuronGroup, Synapses, Network, TimedArray, ms, Hz,
+    prefs, set_device, get_device
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 # =============================================================================
 # Template Loader
 # =============================================================================
 
+@functools.lru_cache(maxsize=32)
+def _load_template(path: str, mtime: float) -> dict:
+    """Parse a template file; cached per (path, modification time)."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_template(path: str) -> dict:
+    """
+    Load a brain region template, parsing each file only once.
+    
+    The parsed template is cached until the file changes on disk, so
+    building several regions from the same template skips json.load.
+    The returned dict is shared between callers and must not be modified.
+    
+    Args:
+        path: Path to JSON template file
+        
+    Returns:
+        dict: Parsed template data
+    """
+    path = os.path.abspath(path)
+    return _load_template(path, os.path.getmtime(path))
+
+
 class BrainRegionTemplate:
     """
     Loads and manages brain region templates from JSON files.
@@ -30,9 +64,11 @@ class BrainRegionTemplate:
     handling neuron groups, connectivity patterns, and metadata.
     
     Attributes:
-        template_data: Raw JSON template data
+        template_data: Raw JSON template data (shared, read-only)
         region_name: Human-readable region name
-        clusters: Dict mapping cluster IDs to neuron group objects
+        clusters: Dict mapping cluster IDs to their name, metadata and neuron
+            groups as parallel "presets"/"groups"/"starts"/"counts" entries
+            (groups are subgroups of one NeuronGroup per neuron preset)
         synapses: List of Brian2 Synapse objects
     """
     
@@ -80,20 +116,31 @@ class BrainRegionTemplate:
         }
     }
     
-    def __init__(self, template_path: str):
+    def __init__(self, template_path: str, standalone: bool = False, verbose: bool = False):
         """
         Load brain region template from JSON file.
         
         Args:
             template_path: Path to JSON template file
+            standalone: If True, switch Brian2 to the C++ standalone device.
+                Runs are then only recorded; call build_standalone() after
+                the last run to compile and execute the whole simulation.
+            verbose: Log construction progress at INFO instead of DEBUG level
         """
-        with open(template_path, 'r') as f:
-            self.template_data = json.load(f)
+        self.template_data = load_template(template_path)
+        self.standalone = standalone
+        self._log_level = logging.INFO if verbose else logging.DEBUG
+        if standalone:
+            # Must happen before any Brian2 object is created
+            prefs.devices.cpp_standalone.openmp_threads = os.cpu_count() or 1
+            set_device("cpp_standalone", build_on_run=False)
         
         self.region_name = self.template_data.get("regionName", "Unknown")
         self.clusters = {}
         self.synapses = []
-        self._neuron_groups = {}  # cluster_id -> NeuronGroup
+        self._preset_groups: Dict[str, NeuronGroup] = {}  # one NeuronGroup per preset
+        self._connection_blocks = {}  # (src_preset, tgt_preset) -> sampled synapse arrays
+        self._group_index: Dict[Tuple[str, str], List[int]] = {}  # (cluster_id, preset) -> group positions
     
     def build_network(self) -> Network:
         """
@@ -105,44 +152,60 @@ class BrainRegionTemplate:
         Returns:
             Network: Brian2 network ready to simulate
         """
-        # Create all neuron groups
+        # Count neurons per preset: all clusters sharing a preset live in one
+        # NeuronGroup, so each preset is code-generated and integrated once
+        totals = {}
         for cluster in self.template_data["clusters"]:
-            cluster_id = cluster["id"]
-            neuron_groups = []
-            
             for group_spec in cluster["neuronGroups"]:
                 preset_name = group_spec["preset"]
-                count = group_spec["count"]
-                
                 if preset_name not in self.NEURON_PRESETS:
                     raise ValueError(f"Unknown neuron preset: {preset_name}")
-                
-                preset = self.NEURON_PRESETS[preset_name]
-                
-                # Create Brian2 NeuronGroup
-                ng = NeuronGroup(
-                    count,
-                    preset["eqs"],
-                    threshold=preset["threshold"],
-                    reset=preset["reset"],
-                    method='euler'
-                )
-                
-                # Initialize voltages
-                ng.v = 'rand() * 0.3'
-                ng.I_input = 0.0
-                ng.I_syn = 0.0
-                
-                neuron_groups.append({
-                    "preset": preset_name,
-                    "group": ng,
-                    "count": count
-                })
+                totals[preset_name] = totals.get(preset_name, 0) + group_spec["count"]
+        
+        for preset_name, total in totals.items():
+            preset = self.NEURON_PRESETS[preset_name]
+            
+            # Create Brian2 NeuronGroup (tau resolved from the preset)
+            ng = NeuronGroup(
+                total,
+                preset["eqs"],
+                threshold=preset["threshold"],
+                reset=preset["reset"],
+                method='euler',
+                namespace={"tau": preset["tau"] * ms}
+            )
+            
+            # Initialize voltages
+            ng.v = 'rand() * 0.3'
+            ng.I_input = 0.0
+            ng.I_syn = 0.0
+            
+            self._preset_groups[preset_name] = ng
+        
+        # Give each cluster its slice of the preset groups. Cluster groups are
+        # stored as parallel lists/arrays, position k describing group k
+        offsets = dict.fromkeys(totals, 0)
+        for cluster in self.template_data["clusters"]:
+            cluster_id = cluster["id"]
+            specs = cluster["neuronGroups"]
+            presets = [group_spec["preset"] for group_spec in specs]
+            counts = np.array([group_spec["count"] for group_spec in specs], dtype=int)
+            starts = np.empty(len(specs), dtype=int)
+            
+            for k, (preset_name, count) in enumerate(zip(presets, counts)):
+                starts[k] = offsets[preset_name]
+                offsets[preset_name] += count
+                self._group_index.setdefault((cluster_id, preset_name), []).append(k)
             
-            self._neuron_groups[cluster_id] = neuron_groups
             self.clusters[cluster_id] = {
                 "name": cluster["name"],
-                "groups": neuron_groups,
+                "presets": presets,
+                "groups": [
+                    self._preset_groups[preset_name][start:start + count]
+                    for preset_name, start, count in zip(presets, starts, counts)
+                ],
+                "starts": starts,  # offsets within the presets' NeuronGroups
+                "counts": counts,
                 "metadata": cluster.get("metadata", {})
             }
         
@@ -160,20 +223,30 @@ class BrainRegionTemplate:
             for conn_spec in conn["connectivity"]:
                 self._create_connections(from_cluster, to_cluster, conn_spec)
         
-        # Create network with all objects
-        all_objects = []
-        for cluster_data in self.clusters.values():
-            for group_data in cluster_data["groups"]:
-                all_objects.append(group_data["group"])
-        all_objects.extend(self.synapses)
+        self._build_synapses()
+        
+        # Create network with all objects. Subgroups are listed explicitly:
+        # Brian2 would otherwise add them at the first run, after which a
+        # state stored before that run could not be restored
+        subgroups = [
+            group
+            for cluster_data in self.clusters.values()
+            for group in cluster_data["groups"]
+        ]
+        all_objects = [*self._preset_groups.values(), *subgroups, *self.synapses]
         
         net = Network(*all_objects)
-        print(f"✓ Built network '{self.region_name}' with {len(all_objects)} objects")
+        logger.log(self._log_level, "✓ Built network '%s' with %d objects",
+                   self.region_name, len(all_objects))
         return net
     
     def _create_connections(self, from_cluster: str, to_cluster: str, conn_spec: dict):
         """
-        Create synaptic connections between neuron groups.
+        Sample synaptic connections between neuron groups.
+        
+        Connections are drawn here but only turned into Brian2 objects by
+        _build_synapses(), which merges all specs between the same pair of
+        preset groups into one Synapses object.
         
         Args:
             from_cluster: Source cluster ID
@@ -194,36 +267,73 @@ class BrainRegionTemplate:
             )
         
         # Take first matching group (templates typically have one group per preset)
-        src_group = from_groups[0]["group"]
-        tgt_group = to_groups[0]["group"]
+        src_cluster, src_k = self.clusters[from_cluster], from_groups[0]
+        tgt_cluster, tgt_k = self.clusters[to_cluster], to_groups[0]
         
-        # Determine synapse equation based on type
+        # Inhibitory connections carry negative weights
         weight = conn_spec.get("weight", 1.0)
         delay = conn_spec.get("delay", 1.0)  # ms
         
         if conn_spec["type"] == "inhibitory":
-            on_pre = f"I_syn -= {weight}"
+            signed_weight = -weight
         elif conn_spec["type"] == "excitatory":
-            on_pre = f"I_syn += {weight}"
+            signed_weight = weight
         else:
             raise ValueError(f"Unknown connection type: {conn_spec['type']}")
         
-        # Create synapse with delay
-        syn = Synapses(
-            src_group,
-            tgt_group,
-            on_pre=on_pre,
-            delay=delay * ms
-        )
-        syn.connect(p=conn_spec.get("probability", 1.0))
+        # Bernoulli sampling of every (source, target) pair, in indices of
+        # the preset groups the clusters are sliced from
+        p = conn_spec.get("probability", 1.0)
+        n_src, n_tgt = src_cluster["counts"][src_k], tgt_cluster["counts"][tgt_k]
+        i, j = np.nonzero(np.random.random((n_src, n_tgt)) < p)
+        
+        block = self._connection_blocks.setdefault((from_preset, to_preset), [])
+        block.append((
+            i + src_cluster["starts"][src_k],
+            j + tgt_cluster["starts"][tgt_k],
+            np.full(i.size, signed_weight),
+            np.full(i.size, delay)
+        ))
+        logger.debug("  → %s.%s → %s.%s (%s, w=%s)", from_cluster, from_preset,
+                     to_cluster, to_preset, conn_spec["type"], weight)
+    
+    def _build_synapses(self):
+        """Create one Synapses object per pair of connected preset groups."""
+        n_synapses = 0
+        for (from_preset, to_preset), block in self._connection_blocks.items():
+            i, j, w, delay = (np.concatenate(arrays) for arrays in zip(*block))
+            n_synapses += i.size
+            
+            syn = Synapses(
+                self._preset_groups[from_preset],
+                self._preset_groups[to_preset],
+                'w : 1',
+                on_pre='I_syn_post += w'
+            )
+            syn.connect(i=i, j=j)
+            syn.w = w
+            syn.delay = delay * ms
+            
+            self.synapses.append(syn)
         
-        self.synapses.append(syn)
-        print(
-            f"  → {from_cluster}.{from_preset} → {to_cluster}.{to_preset} "
-            f"({conn_spec['type']}, w={weight})"
-        )
+        logger.log(self._log_level, "  Created %d synapses across %d preset pairs",
+                   n_synapses, len(self._connection_blocks))
     
-    def _find_groups_by_preset(self, cluster_id: str, preset_name: str) -> List[dict]:
+    def build_standalone(self, directory: str = "output"):
+        """
+        Compile and run all recorded runs of a standalone simulation.
+        
+        Args:
+            directory: Directory for the generated C++ project
+            
+        Raises:
+            RuntimeError: If the template was not created with standalone=True
+        """
+        if not self.standalone:
+            raise RuntimeError("build_standalone() requires standalone=True")
+        get_device().build(directory=directory, compile=True, run=True)
+    
+    def _find_groups_by_preset(self, cluster_id: str, preset_name: str) -> List[int]:
         """
         Find neuron groups matching a preset within a cluster.
         
@@ -232,15 +342,9 @@ class BrainRegionTemplate:
             preset_name: Neuron preset name
             
         Returns:
-            List of matching group dicts
+            List of positions in the cluster's parallel group lists
         """
-        if cluster_id not in self._neuron_groups:
-            return []
-        
-        return [
-            g for g in self._neuron_groups[cluster_id]
-            if g["preset"] == preset_name
-        ]
+        return self._group_index.get((cluster_id, preset_name), [])
     
     def get_cluster_group(self, cluster_id: str, preset_name: str) -> Optional[NeuronGroup]:
         """
@@ -253,8 +357,8 @@ class BrainRegionTemplate:
         Returns:
             NeuronGroup if found, None otherwise
         """
-        groups = self._find_groups_by_preset(cluster_id, preset_name)
-        return groups[0]["group"] if groups else None
+        positions = self._find_groups_by_preset(cluster_id, preset_name)
+        return self.clusters[cluster_id]["groups"][positions[0]] if positions else None
 
 
 # =============================================================================
@@ -276,14 +380,23 @@ class BasalGangliaActionSelection:
         action_pools: Dict mapping action names to input interfaces
     """
     
-    def __init__(self, template_path: str):
+    # Striatal input per unit of utility (D1 grows, D2 shrinks with utility)
+    D1_GAIN = 0.5
+    D2_GAIN = 0.3
+    
+    def __init__(self, template_path: str, standalone: bool = False, verbose: bool = False):
         """
         Initialize action selection system from template.
         
         Args:
             template_path: Path to basal ganglia JSON template
+            standalone: Use Brian2's C++ standalone device (see
+                BrainRegionTemplate); results are available after
+                template.build_standalone()
+            verbose: Log progress at INFO instead of DEBUG level
         """
-        self.template = BrainRegionTemplate(template_path)
+        self._log_level = logging.INFO if verbose else logging.DEBUG
+        self.template = BrainRegionTemplate(template_path, standalone=standalone, verbose=verbose)
         self.network = self.template.build_network()
         self.action_pools = {}  # action_name -> {"D1": group, "D2": group}
         
@@ -296,11 +409,34 @@ class BasalGangliaActionSelection:
         if not all([self.striatum_d1, self.striatum_d2, self.gpi, self.thalamus]):
             raise ValueError("Missing critical basal ganglia components in template")
         
-        print(f"✓ Basal Ganglia Action Selection initialized")
-        print(f"  - Striatum D1: {len(self.striatum_d1)} neurons")
-        print(f"  - Striatum D2: {len(self.striatum_d2)} neurons")
-        print(f"  - GPi/SNr: {len(self.gpi)} neurons")
-        print(f"  - Thalamus: {len(self.thalamus)} neurons")
+        self._schedule_ops = []  # run_regularly operations from schedule_action_utilities
+        self._action_names: List[str] = []  # registration order
+        self._action_bins = np.zeros(0, dtype=np.intp)  # thalamic segment starts
+        
+        # Snapshot the reset state (tonic GPi input) once so reset() restores
+        # inputs and synapses in one call; the system itself is left as built,
+        # with GPi input unchanged until the first reset(). The snapshot
+        # network holds only the template's own objects so that monitors
+        # added to self.network later do not invalidate it.
+        self._baseline = Network(*self.network.objects)
+        try:
+            gpi_input = np.array(self.gpi.I_input)
+        except NotImplementedError:
+            # Standalone devices cannot read or store state before the build
+            self._has_snapshot = False
+        else:
+            self.gpi.I_input = 0.1  # Tonic activity
+            self._baseline.store("init")
+            self.gpi.I_input = gpi_input
+            self._has_snapshot = True
+        
+        logger.log(
+            self._log_level,
+            "✓ Basal Ganglia Action Selection initialized\n"
+            "  - Striatum D1: %d neurons\n  - Striatum D2: %d neurons\n"
+            "  - GPi/SNr: %d neurons\n  - Thalamus: %d neurons",
+            len(self.striatum_d1), len(self.striatum_d2), len(self.gpi), len(self.thalamus)
+        )
     
     def register_action(self, action_name: str, d1_indices: List[int], d2_indices: List[int]):
         """
@@ -311,11 +447,19 @@ class BasalGangliaActionSelection:
             d1_indices: Indices in Striatum D1 for this action
             d2_indices: Indices in Striatum D2 for this action
         """
+        # Stored as index arrays so utilities are written in one assignment
         self.action_pools[action_name] = {
-            "d1_indices": d1_indices,
-            "d2_indices": d2_indices
+            "d1_indices": np.asarray(d1_indices, dtype=np.int32),
+            "d2_indices": np.asarray(d2_indices, dtype=np.int32)
         }
-        print(f"✓ Registered action '{action_name}' (D1: {len(d1_indices)}, D2: {len(d2_indices)} neurons)")
+        
+        # Map thalamic neurons to actions (simplified: equal distribution,
+        # the last action also takes the remainder)
+        self._action_names = list(self.action_pools)
+        neurons_per_action = len(self.thalamus) // len(self._action_names)
+        self._action_bins = np.arange(len(self._action_names), dtype=np.intp) * neurons_per_action
+        logger.log(self._log_level, "✓ Registered action '%s' (D1: %d, D2: %d neurons)",
+                   action_name, len(d1_indices), len(d2_indices))
     
     def set_action_utility(self, action_name: str, utility: float):
         """
@@ -334,60 +478,122 @@ class BasalGangliaActionSelection:
         pool = self.action_pools[action_name]
         
         # Direct pathway: higher utility → higher input
-        for idx in pool["d1_indices"]:
-            self.striatum_d1.I_input[idx] = utility * 0.5
+        self.striatum_d1.I_input[pool["d1_indices"]] = utility * self.D1_GAIN
         
         # Indirect pathway: higher utility → lower input (less suppression)
-        for idx in pool["d2_indices"]:
-            self.striatum_d2.I_input[idx] = (1.0 - utility) * 0.3
+        self.striatum_d2.I_input[pool["d2_indices"]] = (1.0 - utility) * self.D2_GAIN
     
-    def get_selected_action(self) -> Tuple[Optional[str], float]:
+    def schedule_action_utilities(self, schedule: Dict[str, List[float]], interval=100 * ms):
+        """
+        Schedule action utilities over time for a single simulation run.
+        
+        Entry k of each utility list applies during [k * interval,
+        (k + 1) * interval), measured from the network time at which the
+        schedule is installed (time keeps running across reset()). Striatal inputs are read from TimedArrays by
+        run_regularly operations, so a sequence of scenarios needs one
+        network.run() instead of one run per utility change (and a single
+        build on standalone devices). Neurons of actions missing from the
+        schedule receive no input. Replaces any previous schedule.
+        
+        Args:
+            schedule: Dict mapping action names to per-interval utilities
+            interval: Duration of each schedule step (default: 100 ms)
+            
+        Raises:
+            KeyError: If an action is not registered
+            ValueError: If the utility lists are empty or differ in length
+        """
+        for action_name in schedule:
+            if action_name not in self.action_pools:
+                raise KeyError(f"Action '{action_name}' not registered")
+        
+        lengths = {len(utilities) for utilities in schedule.values()}
+        if len(lengths) != 1 or 0 in lengths:
+            raise ValueError("Utility schedules must be non-empty and of equal length")
+        n_steps = lengths.pop()
+        
+        d1_drive = np.zeros((n_steps, len(self.striatum_d1)))
+        d2_drive = np.zeros((n_steps, len(self.striatum_d2)))
+        for action_name, utilities in schedule.items():
+            pool = self.action_pools[action_name]
+            utility = np.asarray(utilities, dtype=float)[:, None]
+            d1_drive[:, pool["d1_indices"]] = utility * self.D1_GAIN
+            d2_drive[:, pool["d2_indices"]] = (1.0 - utility) * self.D2_GAIN
+        
+        self._clear_schedule()
+        
+        # D1 and D2 are subgroups of one group and share its namespace,
+        # so each pathway's TimedArray (and start time) needs its own name
+        t0 = self.network.t
+        for group, name, drive in ((self.striatum_d1, "d1_drive", d1_drive),
+                                   (self.striatum_d2, "d2_drive", d2_drive)):
+            group.namespace[name] = TimedArray(drive, dt=interval)
+            group.namespace[f"{name}_t0"] = t0
+            op = group.run_regularly(
+                f"I_input = {name}(t - {name}_t0, i)", dt=interval, when="start"
+            )
+            self.network.add(op)
+            self._schedule_ops.append((group, op))
+    
+    def _clear_schedule(self):
+        """Remove the run_regularly operations of a previous schedule."""
+        for group, op in self._schedule_ops:
+            self.network.remove(op)
+            group.contained_objects.remove(op)
+        self._schedule_ops = []
+    
+    def get_selected_action(self, thal_activity: Optional[np.ndarray] = None) -> Tuple[Optional[str], float]:
         """
         Determine which action is currently selected.
         
         The selected action is the one with the highest thalamic activity,
         which occurs when GPi is most inhibited (disinhibition).
         
+        Args:
+            thal_activity: Thalamic voltages to evaluate (e.g. one time slice
+                of a StateMonitor). Defaults to the current thalamus state.
+        
         Returns:
             Tuple of (action_name, confidence) where confidence is the
             normalized thalamic activity. Returns (None, 0.0) if no clear winner.
         """
-        # Map thalamic neurons to actions (simplified: equal distribution)
-        n_actions = len(self.action_pools)
-        if n_actions == 0:
+        if not self._action_names:
             return None, 0.0
         
-        thal_activity = self.thalamus.v[:]
-        neurons_per_action = len(thal_activity) // n_actions
+        if thal_activity is None:
+            thal_activity = self.thalamus.v[:]
+        thal_activity = np.asarray(thal_activity)
         
-        action_scores = {}
-        for i, action_name in enumerate(self.action_pools.keys()):
-            start_idx = i * neurons_per_action
-            end_idx = (i + 1) * neurons_per_action if i < n_actions - 1 else len(thal_activity)
-            action_scores[action_name] = float(np.mean(thal_activity[start_idx:end_idx]))
+        # Mean activity of every action's thalamic segment in one pass
+        sums = np.add.reduceat(thal_activity, self._action_bins)
+        counts = np.diff(np.append(self._action_bins, len(thal_activity)))
+        means = sums / counts
         
         # Winner-take-all selection
-        if not action_scores:
-            return None, 0.0
-        
-        winner = max(action_scores, key=action_scores.get)
-        confidence = action_scores[winner]
-        
-        return winner, confidence
+        winner_idx = int(np.argmax(means))
+        return self._action_names[winner_idx], float(means[winner_idx])
     
     def reset(self):
-        """Reset all neuron voltages and inputs to baseline."""
-        if self.striatum_d1:
-            self.striatum_d1.v = 'rand() * 0.3'
+        """
+        Reset inputs and synapses to baseline and re-randomize voltages.
+        
+        Restores the snapshot taken at construction (striatal and thalamic
+        input 0, tonic GPi input 0.1) and drops any utility schedule, then
+        draws fresh random voltages so repeated trials start from different
+        states. Simulation time keeps running, so monitors added to the
+        network stay valid. On standalone devices, where state cannot be
+        stored, inputs are re-initialized group by group instead.
+        """
+        self._clear_schedule()
+        if self._has_snapshot:
+            self._baseline.restore("init")
+        else:
             self.striatum_d1.I_input = 0.0
-        if self.striatum_d2:
-            self.striatum_d2.v = 'rand() * 0.3'
             self.striatum_d2.I_input = 0.0
-        if self.gpi:
-            self.gpi.v = 'rand() * 0.3'
             self.gpi.I_input = 0.1  # Tonic activity
-        if self.thalamus:
-            self.thalamus.v = 'rand() * 0.3'
             self.thalamus.I_input = 0.0
         
-        print("✓ Basal ganglia state reset")
+        for group in (self.striatum_d1, self.striatum_d2, self.gpi, self.thalamus):
+            group.v = 'rand() * 0.3'
+        
+        logger.log(self._log_level, "✓ Basal ganglia state reset")
@@ -13,9 +13,45 @@ Author: Zae Project
 License: MIT
 """
 
+import functools
+import hashlib
+import os
+from collections import OrderedDict
+
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Union
 
+from scripts._kernels import (
+    HAVE_JAX, cleanup_trajectory, dot, nearest_match, normalize_inplace, normalize_rows_inplace,
+    settle, settle_batch_jax, superpose
+)
+
+try:
+    # scipy.fft keeps float32 input in single precision (complex64 spectra);
+    # numpy.fft always computes in double precision
+    import scipy.fft as _fft
+except ImportError:  # pragma: no cover - exercised only without scipy
+    _fft = np.fft
+
+try:
+    from scipy.linalg import cho_factor, cho_solve
+except ImportError:  # pragma: no cover - exercised only without scipy
+    cho_factor = cho_solve = None
+
+# Single-vector transforms of a fixed, small size are dominated by per-call
+# overhead rather than arithmetic, and numpy.fft dispatches about twice as
+# fast as scipy.fft there (pocketfft caches the plan for each length either
+# way). Batched transforms stay on _fft, where single precision pays off.
+_vec_fft = np.fft
+
+try:
+    # Optional GPU mirror for similarity search over large vocabularies
+    import cupy as cp
+    HAVE_CUPY = True
+except ImportError:  # pragma: no cover - exercised only with cupy
+    cp = None
+    HAVE_CUPY = False
+
 
 # =============================================================================
 # Core Mathematical Operations
@@ -50,14 +86,11 @@ def circular_convolution(a: np.ndarray, b: np.ndarray) -> np.ndarray:
         raise ValueError(f"Vector dimensions must match: {len(a)} != {len(b)}")
 
     # Circular convolution via FFT: A ⊛ B = IFFT(FFT(A) * FFT(B))
-    result = np.fft.irfft(np.fft.rfft(a) * np.fft.rfft(b), n=len(a))
+    dtype = _float_dtype(a, b)
+    result = _vec_fft.irfft(_vec_fft.rfft(a) * _vec_fft.rfft(b), n=len(a)).astype(dtype, copy=False)
 
-    # Normalize to unit vector
-    norm = np.linalg.norm(result)
-    if norm > 1e-10:  # Avoid division by zero
-        result = result / norm
-
-    return result
+    # Normalize to unit vector (compiled kernel; zero vectors left as is)
+    return normalize_inplace(result)
 
 
 def circular_correlation(c: np.ndarray, a: np.ndarray) -> np.ndarray:
@@ -90,14 +123,142 @@ def circular_correlation(c: np.ndarray, a: np.ndarray) -> np.ndarray:
         raise ValueError(f"Vector dimensions must match: {len(c)} != {len(a)}")
 
     # Circular correlation via FFT: C ⊛ A' = IFFT(FFT(C) * conj(FFT(A)))
-    result = np.fft.irfft(np.fft.rfft(c) * np.conj(np.fft.rfft(a)), n=len(c))
+    dtype = _float_dtype(c, a)
+    a = np.ascontiguousarray(a)
+    key_spectrum = _conj_rfft(a.tobytes(), a.dtype.str)
+    result = _vec_fft.irfft(_vec_fft.rfft(c) * key_spectrum, n=len(c)).astype(dtype, copy=False)
 
     # Normalize to unit vector
-    norm = np.linalg.norm(result)
-    if norm > 1e-10:
-        result = result / norm
+    return normalize_inplace(result)
+
+
+def circular_convolution_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Bind many pairs of semantic pointers at once (row-wise A ⊛ B).
+
+    Transforms every row with a single FFT call along the last axis, which
+    amortizes the FFT overhead that dominates at typical dimensions.
+
+    Args:
+        a: First semantic pointers (batch × n)
+        b: Second semantic pointers (batch × n), or one vector (n,) bound
+           with every row of a
+
+    Returns:
+        np.ndarray: Bound semantic pointers (batch × n), each row normalized
+
+    Example:
+        >>> roles = np.random.randn(3, 50)
+        >>> fillers = np.random.randn(3, 50)
+        >>> bound = circular_convolution_batch(roles, fillers)
+        >>> print(bound.shape)
+        (3, 50)
+    """
+    a, b = np.asarray(a), np.asarray(b)
+    if a.shape[-1] != b.shape[-1]:
+        raise ValueError(f"Vector dimensions must match: {a.shape[-1]} != {b.shape[-1]}")
+
+    n = a.shape[-1]
+    result = _fft.irfft(_fft.rfft(a, axis=-1) * _fft.rfft(b, axis=-1), n=n, axis=-1)
+    return _normalize_rows(result.astype(_float_dtype(a, b), copy=False))
 
-    return result
+
+def circular_correlation_batch(c: np.ndarray, a: np.ndarray) -> np.ndarray:
+    """
+    Unbind many semantic pointers at once (row-wise C ⊛ A').
+
+    Args:
+        c: Bound semantic pointers (batch × n)
+        a: Keys to unbind with (batch × n), or one key (n,) for every row
+
+    Returns:
+        np.ndarray: Unbound semantic pointers (batch × n), each row normalized
+    """
+    c, a = np.asarray(c), np.asarray(a)
+    if c.shape[-1] != a.shape[-1]:
+        raise ValueError(f"Vector dimensions must match: {c.shape[-1]} != {a.shape[-1]}")
+
+    n = c.shape[-1]
+    result = _fft.irfft(
+        _fft.rfft(c, axis=-1) * np.conj(_fft.rfft(a, axis=-1)), n=n, axis=-1
+    )
+    return _normalize_rows(result.astype(_float_dtype(c, a), copy=False))
+
+
+def apply_circ_conv(vector: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Circularly convolve every column of a matrix with a fixed vector.
+
+    Equivalent to ``circulant(vector) @ matrix`` (column j becomes
+    vector ⊛ matrix[:, j]) without building the dim × dim circulant: all
+    columns are filtered with one batched FFT. Unlike circular_convolution
+    the result is not normalized, since it is a linear transform of the
+    matrix (e.g. decoders when building binding weights).
+
+    Args:
+        vector: Semantic pointer to convolve with (dim,)
+        matrix: Matrix whose columns are transformed (dim × m)
+
+    Returns:
+        np.ndarray: Transformed matrix (dim × m)
+
+    Example:
+        >>> transformed = apply_circ_conv(circle, encoder.decoders)
+        >>> transformed.shape == encoder.decoders.shape
+        True
+    """
+    vector, matrix = np.asarray(vector), np.asarray(matrix)
+    if matrix.shape[0] != len(vector):
+        raise ValueError(f"Vector dimensions must match: {len(vector)} != {matrix.shape[0]}")
+
+    return _convolve_columns(matrix, _fft.rfft(vector))
+
+
+def _convolve_columns(matrix: np.ndarray, spectrum: np.ndarray) -> np.ndarray:
+    """Filter every column of matrix with a real-FFT spectrum (circular convolution)."""
+    return _fft.irfft(_fft.rfft(matrix, axis=0) * spectrum[:, None],
+                      n=matrix.shape[0], axis=0)
+
+
+@functools.lru_cache(maxsize=256)
+def _conj_rfft(key_bytes: bytes, dtype: str) -> np.ndarray:
+    """
+    Conjugated real FFT of an unbinding key, memoized on the key's contents.
+
+    The same key is typically used to unbind many bound pointers, so its
+    spectrum is computed once. The cached array is read-only.
+    """
+    spectrum = np.conj(_vec_fft.rfft(np.frombuffer(key_bytes, dtype=dtype)))
+    spectrum.flags.writeable = False
+    return spectrum
+
+
+def _float_dtype(*vectors: np.ndarray) -> np.dtype:
+    """Floating dtype of an operation's result: float32 unless an input is wider."""
+    return np.result_type(*(np.asarray(v).dtype for v in vectors), np.float32)
+
+
+def _aligned_empty(shape: Tuple[int, ...], dtype, alignment: int = 64) -> np.ndarray:
+    """
+    Uninitialized C-contiguous array whose data starts on an alignment boundary.
+
+    Matrices used in per-tick matrix-vector products (encoders, decoders,
+    cleanup weights) are allocated this way so BLAS can use aligned vector
+    loads from the first element; NumPy itself only guarantees 16 bytes.
+    Rows are not padded, so later rows are aligned only when the row size
+    is a multiple of the alignment.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buf = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -buf.ctypes.data % alignment
+    return buf[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normalize each row of a C-contiguous array in place (near-zero rows kept)."""
+    normalize_rows_inplace(vectors.reshape(-1, vectors.shape[-1]))
+    return vectors
 
 
 def superposition(*vectors: np.ndarray) -> np.ndarray:
@@ -131,15 +292,9 @@ def superposition(*vectors: np.ndarray) -> np.ndarray:
         if len(v) != dim:
             raise ValueError(f"Vector {i} has dimension {len(v)}, expected {dim}")
 
-    # Sum all vectors
-    result = np.sum(vectors, axis=0)
-
-    # Normalize to unit vector
-    norm = np.linalg.norm(result)
-    if norm > 1e-10:
-        result = result / norm
-
-    return result
+    # Sum and normalize in one compiled pass over the stacked vectors
+    stacked = np.stack(vectors).astype(_float_dtype(*vectors), copy=False)
+    return superpose(stacked)
 
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
@@ -167,7 +322,7 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
         raise ValueError(f"Vector dimensions must match: {len(a)} != {len(b)}")
 
     # For unit vectors, cosine similarity = dot product
-    return float(np.dot(a, b))
+    return float(dot(np.asarray(a), np.asarray(b)))
 
 
 # =============================================================================
@@ -182,9 +337,35 @@ class SemanticVocabulary:
     human-readable names. Supports creation, binding, unbinding, and
     superposition operations.
 
+    Vectors are stored as float32 by default: 50-d unit vectors need nothing
+    more, and single precision halves the memory traffic of similarity,
+    binding and cleanup.
+
+    Below CIRCULANT_MAX_DIM dimensions, bind/unbind multiply by the key's
+    cached circulant matrix: a small matrix-vector product is cheaper than
+    the FFT round trip. Larger vocabularies use cached FFT spectra.
+
+    All vectors live as rows of one contiguous matrix (grown by doubling),
+    so comparing a query against the whole vocabulary is a single
+    matrix-vector product (see similarity_all). Overwriting a name rewrites
+    its row in place, so get() and the vectors dict hand out read-only row
+    views that follow later overwrites, while add, bind, unbind and
+    superpose return copies that stay valid.
+
+    With backend="cupy" a device copy of that matrix is kept for whole-
+    vocabulary similarity searches (similarity_all, best_match,
+    similarity_matrix); it is uploaded lazily and re-uploaded after the
+    vocabulary changes. Named vectors and binding stay on the host.
+
     Attributes:
         vectors: Dictionary mapping names to semantic pointer vectors
+            (read-only row views into the vocabulary matrix, in insertion
+            order)
         dim: Dimensionality of all vectors in this vocabulary
+        dtype: Floating-point type of the stored vectors (default float32)
+        backend: Array library used for similarity searches ("numpy" or "cupy")
+        version: Counter incremented whenever a vector is stored, so caches
+            derived from the vocabulary can detect that they are stale
 
     Example:
         >>> vocab = SemanticVocabulary(dimensionality=50)
@@ -195,18 +376,44 @@ class SemanticVocabulary:
         >>> print(similarity)  # Should be close to 0 (dissimilar after binding)
     """
 
-    def __init__(self, dimensionality: int = 50):
+    # Dimensions below which binding uses cached circulant matrices
+    CIRCULANT_MAX_DIM = 128
+
+    # Rows allocated for the vector matrix before the first growth
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, dimensionality: int = 50, dtype=np.float32, backend: str = "numpy"):
         """
         Initialize vocabulary with specified dimensionality.
 
         Args:
             dimensionality: Vector dimension (default 50 per Eliasmith 2013)
+            dtype: Floating-point type of stored vectors (default float32)
+            backend: "numpy" (default) or "cupy" to run similarity searches
+                on the GPU
+
+        Raises:
+            ValueError: If dimensionality < 2 or the backend is unknown
+            ImportError: If backend="cupy" but CuPy is not installed
         """
         if dimensionality < 2:
             raise ValueError("Dimensionality must be at least 2")
+        if backend not in ("numpy", "cupy"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'numpy' or 'cupy'")
+        if backend == "cupy" and not HAVE_CUPY:
+            raise ImportError("backend='cupy' requires CuPy to be installed")
 
         self.dim = dimensionality
+        self.dtype = np.dtype(dtype)
         self.vectors: Dict[str, np.ndarray] = {}
+        self._matrix = np.empty((self.INITIAL_CAPACITY, self.dim), dtype=self.dtype)
+        self._name_to_idx: Dict[str, int] = {}  # name -> row of _matrix
+        self._fft_cache: Dict[str, np.ndarray] = {}  # name -> rfft(vector)
+        self._conj_fft_cache: Dict[str, np.ndarray] = {}  # name -> conj(rfft(vector))
+        self._circulant_cache: Dict[str, np.ndarray] = {}  # name -> circulant(vector)
+        self.backend = backend
+        self.version = 0
+        self._device_matrix = None  # cupy copy of the filled rows, None when stale
 
     def add(self, name: str, vector: Optional[np.ndarray] = None) -> np.ndarray:
         """
@@ -228,17 +435,194 @@ class SemanticVocabulary:
         if vector is None:
             # Generate random unit vector using Gaussian distribution
             vector = np.random.randn(self.dim)
-            vector = vector / np.linalg.norm(vector)
         else:
             if len(vector) != self.dim:
                 raise ValueError(f"Vector dimension {len(vector)} != {self.dim}")
-            # Ensure unit vector
-            norm = np.linalg.norm(vector)
-            if norm > 1e-10:
-                vector = vector / norm
+            # Private copy in the vocabulary dtype, so the caller's array is untouched
+            vector = np.array(vector, dtype=self.dtype)
+
+        # Ensure unit vector
+        return self._store(name, normalize_inplace(vector))
+
+    def add_many(self, names: List[str],
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Add several random semantic pointers at once.
 
+        All vectors are drawn with one standard_normal call directly into
+        the vocabulary matrix and normalized in place, instead of one
+        randn call and allocation per name.
+
+        Args:
+            names: Identifiers of the new semantic pointers
+            rng: Random generator to draw from (default: a fresh
+                np.random.default_rng(); pass one for reproducibility)
+
+        Returns:
+            np.ndarray: The added vectors (n_names × dim), in the order given
+
+        Raises:
+            ValueError: If a name already exists or is repeated
+
+        Example:
+            >>> vocab.add_many(["RED", "GREEN", "BLUE"], rng=np.random.default_rng(0))
+        """
+        names = list(names)
+        if len(set(names)) != len(names):
+            raise ValueError("Semantic pointer names must be unique")
+        for name in names:
+            if name in self.vectors:
+                raise ValueError(f"Semantic pointer '{name}' already exists")
+        if rng is None:
+            rng = np.random.default_rng()
+
+        start = len(self._name_to_idx)
+        stop = start + len(names)
+        while stop > len(self._matrix):
+            self._grow()
+
+        block = self._matrix[start:stop]
+        if self.dtype in (np.float32, np.float64):
+            rng.standard_normal(out=block, dtype=self.dtype)
+        else:
+            block[:] = rng.standard_normal(block.shape)
+        normalize_rows_inplace(block)
+
+        for offset, name in enumerate(names):
+            self._name_to_idx[name] = start + offset
+            self.vectors[name] = self._row(start + offset)
+        self._device_matrix = None
+        self.version += 1
+        return block.copy()
+
+    def _store(self, name: str, vector: np.ndarray) -> np.ndarray:
+        """
+        Store a vector under name (overwriting), in the vocabulary dtype.
+
+        Returns a copy of the stored row, so results handed to callers are
+        not changed when the name is overwritten later.
+        """
+        if name in self._name_to_idx:
+            row = self._name_to_idx[name]
+        else:
+            row = len(self._name_to_idx)
+            if row == len(self._matrix):
+                self._grow()
+            self._name_to_idx[name] = row
+
+        self._matrix[row] = vector
+        vector = self._row(row)
         self.vectors[name] = vector
-        return vector
+        self._fft_cache.pop(name, None)
+        self._conj_fft_cache.pop(name, None)
+        self._circulant_cache.pop(name, None)
+        self._device_matrix = None
+        self.version += 1
+        return vector.copy()
+
+    def _row(self, row: int) -> np.ndarray:
+        """Read-only view of one row of the vector matrix."""
+        view = self._matrix[row]
+        view.flags.writeable = False
+        return view
+
+    def _grow(self):
+        """Double the capacity of the vector matrix and re-point the row views."""
+        matrix = np.empty((2 * len(self._matrix), self.dim), dtype=self.dtype)
+        matrix[:len(self._matrix)] = self._matrix
+        self._matrix = matrix
+        self.vectors = {name: self._row(row) for name, row in self._name_to_idx.items()}
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        All semantic pointers stacked as rows, in insertion order.
+
+        A read-only view of the vocabulary's contiguous storage (no copy);
+        each row is a unit vector. Store vectors through add/bind/etc. so
+        that caches and the version counter stay consistent.
+
+        Returns:
+            np.ndarray: Vocabulary matrix (len(self) × dim)
+        """
+        view = self._matrix[:len(self._name_to_idx)]
+        view.flags.writeable = False
+        return view
+
+    def to_device(self):
+        """
+        Return the vocabulary matrix on the similarity-search backend.
+
+        Returns:
+            Filled rows of the vector matrix (len(self) × dim): a host view
+            for the numpy backend, a cached cupy array for the cupy backend
+        """
+        n = len(self._name_to_idx)
+        if self.backend == "numpy":
+            return self._matrix[:n]
+        if self._device_matrix is None:
+            self._device_matrix = cp.asarray(self._matrix[:n])
+        return self._device_matrix
+
+    @staticmethod
+    def to_host(array) -> np.ndarray:
+        """
+        Copy a backend array back to host memory (no-op for NumPy arrays).
+
+        Args:
+            array: NumPy or CuPy array
+
+        Returns:
+            np.ndarray: Host array
+        """
+        if HAVE_CUPY and isinstance(array, cp.ndarray):
+            return cp.asnumpy(array)
+        return np.asarray(array)
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        """Dot products of query with every stored pointer, on the host."""
+        if len(query) != self.dim:
+            raise ValueError(f"Vector dimension {len(query)} != {self.dim}")
+
+        matrix = self.to_device()
+        query = np.asarray(query, dtype=self.dtype)
+        if self.backend == "cupy":
+            query = cp.asarray(query)
+        return self.to_host(matrix @ query)
+
+    def _circulant(self, name: str) -> np.ndarray:
+        """
+        Return the cached circulant matrix of a named semantic pointer.
+
+        C[i, j] = v[(i - j) % dim], so C @ x = v ⊛ x and C.T @ x = x ⊛ v'.
+        Built on first use of the pointer as a key.
+        """
+        if name not in self._circulant_cache:
+            v = self.get(name)
+            idx = (np.arange(self.dim)[:, None] - np.arange(self.dim)) % self.dim
+            self._circulant_cache[name] = v[idx]
+        return self._circulant_cache[name]
+
+    def _spectrum(self, name: str) -> np.ndarray:
+        """
+        Return the cached real FFT of a named semantic pointer.
+
+        Computed on first use, so vocabularies that bind through circulant
+        matrices (dim < CIRCULANT_MAX_DIM) never pay for it.
+        """
+        if name not in self._fft_cache:
+            self._fft_cache[name] = _vec_fft.rfft(self.get(name))
+        return self._fft_cache[name]
+
+    def _conj_spectrum(self, name: str) -> np.ndarray:
+        """Return the cached conjugate spectrum of a pointer used as unbinding key."""
+        if name not in self._conj_fft_cache:
+            self._conj_fft_cache[name] = np.conj(self._spectrum(name))
+        return self._conj_fft_cache[name]
+
+    def _bind_freq(self, fa: np.ndarray, fb: np.ndarray) -> np.ndarray:
+        """Inverse-transform a product of spectra into a normalized pointer."""
+        return normalize_inplace(_vec_fft.irfft(fa * fb, n=self.dim))
 
     def get(self, name: str) -> np.ndarray:
         """
@@ -248,7 +632,8 @@ class SemanticVocabulary:
             name: Identifier of the semantic pointer
 
         Returns:
-            np.ndarray: The semantic pointer vector
+            np.ndarray: The semantic pointer vector, as a read-only view
+                that reflects later overwrites of name (copy it to keep)
 
         Raises:
             KeyError: If name doesn't exist in vocabulary
@@ -269,11 +654,33 @@ class SemanticVocabulary:
         Returns:
             np.ndarray: The bound semantic pointer
         """
-        a = self.get(name_a)
-        b = self.get(name_b)
-        result = circular_convolution(a, b)
-        self.vectors[result_name] = result
-        return result
+        if self.dim < self.CIRCULANT_MAX_DIM:
+            result = normalize_inplace(self._circulant(name_b) @ self.get(name_a))
+        else:
+            result = self._bind_freq(self._spectrum(name_a), self._spectrum(name_b))
+        return self._store(result_name, result)
+
+    def bind_many(self, bindings: List[Tuple[str, str, str]]) -> np.ndarray:
+        """
+        Bind several pairs of semantic pointers with one batched inverse FFT.
+
+        Args:
+            bindings: List of (name_a, name_b, result_name) triples
+
+        Returns:
+            np.ndarray: The bound semantic pointers (n_bindings × dim), in
+                the order given
+
+        Example:
+            >>> vocab.bind_many([("COLOR", "RED", "C_R"), ("SHAPE", "CIRCLE", "S_C")])
+        """
+        fa = np.stack([self._spectrum(name_a) for name_a, _, _ in bindings])
+        fb = np.stack([self._spectrum(name_b) for _, name_b, _ in bindings])
+        results = _normalize_rows(_fft.irfft(fa * fb, n=self.dim, axis=-1))
+        return np.stack([
+            self._store(result_name, result)
+            for (_, _, result_name), result in zip(bindings, results)
+        ])
 
     def unbind(self, bound_name: str, key_name: str, result_name: str) -> np.ndarray:
         """
@@ -287,11 +694,11 @@ class SemanticVocabulary:
         Returns:
             np.ndarray: The unbound semantic pointer
         """
-        bound = self.get(bound_name)
-        key = self.get(key_name)
-        result = circular_correlation(bound, key)
-        self.vectors[result_name] = result
-        return result
+        if self.dim < self.CIRCULANT_MAX_DIM:
+            result = normalize_inplace(self._circulant(key_name).T @ self.get(bound_name))
+        else:
+            result = self._bind_freq(self._spectrum(bound_name), self._conj_spectrum(key_name))
+        return self._store(result_name, result)
 
     def superpose(self, *names: str, result_name: str) -> np.ndarray:
         """
@@ -306,8 +713,7 @@ class SemanticVocabulary:
         """
         vectors = [self.get(name) for name in names]
         result = superposition(*vectors)
-        self.vectors[result_name] = result
-        return result
+        return self._store(result_name, result)
 
     def similarity(self, name_a: str, name_b: str) -> float:
         """
@@ -324,6 +730,85 @@ class SemanticVocabulary:
         b = self.get(name_b)
         return cosine_similarity(a, b)
 
+    def similarity_all(self, query: np.ndarray) -> Dict[str, float]:
+        """
+        Compute the similarity of a vector to every semantic pointer.
+
+        Args:
+            query: Semantic pointer to compare (dim,)
+
+        Returns:
+            Dict mapping each name (in insertion order) to its dot product
+            with the query
+
+        Raises:
+            ValueError: If the query dimension doesn't match the vocabulary
+
+        Example:
+            >>> scores = vocab.similarity_all(noisy)
+            >>> best = max(scores, key=scores.get)
+        """
+        scores = self._scores(query)
+        return dict(zip(self._name_to_idx, scores.tolist()))
+
+    def best_match(self, query: np.ndarray, top_k: int = 1) -> List[Tuple[str, float]]:
+        """
+        Find the semantic pointers most similar to a query.
+
+        Scores the whole vocabulary with one matrix-vector product and
+        selects the top k with a partial sort.
+
+        Args:
+            query: Semantic pointer to match (dim,)
+            top_k: Number of matches to return (default: 1)
+
+        Returns:
+            List of (name, similarity) pairs, most similar first
+
+        Raises:
+            ValueError: If the vocabulary is empty, the query dimension
+                doesn't match or top_k < 1
+
+        Example:
+            >>> recovered = vocab.unbind("SHAPE_CIRCLE", "CIRCLE", "RECOVERED")
+            >>> vocab.best_match(recovered, top_k=2)
+        """
+        if top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {top_k}")
+
+        n = len(self._name_to_idx)
+        if n == 0:
+            raise ValueError("Cannot match against an empty vocabulary")
+        scores = self._scores(query)
+
+        top_k = min(top_k, n)
+        top = np.argpartition(scores, n - top_k)[n - top_k:]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        names = list(self._name_to_idx)
+        return [(names[i], float(scores[i])) for i in top]
+
+    def similarity_matrix(self, other: "SemanticVocabulary") -> np.ndarray:
+        """
+        Compute similarities between all pointers of two vocabularies.
+
+        Args:
+            other: Vocabulary of the same dimensionality
+
+        Returns:
+            np.ndarray: Matrix (len(self) × len(other)) of dot products, rows
+                and columns in insertion order
+
+        Raises:
+            ValueError: If the dimensionalities differ
+        """
+        if other.dim != self.dim:
+            raise ValueError(f"Vocabulary dimensions must match: {self.dim} != {other.dim}")
+
+        if self.backend == "cupy":
+            return self.to_host(self.to_device() @ cp.asarray(other._matrix[:len(other)]).T)
+        return self._matrix[:len(self)] @ other._matrix[:len(other)].T
+
     def __contains__(self, name: str) -> bool:
         """Check if semantic pointer exists in vocabulary."""
         return name in self.vectors
@@ -353,6 +838,8 @@ class NeuralEncoder:
         dim: Dimensionality of semantic pointer space
         encoders: Preferred direction vectors for each neuron (n_neurons × dim)
         decoders: Optimal decoding weights (dim × n_neurons), computed lazily
+        dtype: Floating-point type of encoders, decoders and firing rates
+            (default float32)
 
     Example:
         >>> encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50)
@@ -366,7 +853,8 @@ class NeuralEncoder:
         Eliasmith & Anderson (2003). Neural Engineering. Chapter 4.
     """
 
-    def __init__(self, n_neurons: int, sp_dimensionality: int = 50, seed: Optional[int] = None):
+    def __init__(self, n_neurons: int, sp_dimensionality: int = 50, seed: Optional[int] = None,
+                 dtype=np.float32, cache_dir: Optional[str] = None):
         """
         Initialize neural encoder with random preferred directions.
 
@@ -374,6 +862,10 @@ class NeuralEncoder:
             n_neurons: Number of neurons in the population
             sp_dimensionality: Dimension of semantic pointer vectors
             seed: Random seed for reproducibility (optional)
+            dtype: Floating-point type of encoders and decoders (default float32)
+            cache_dir: Directory in which solved decoders are persisted and
+                reused by encoders with identical encoder matrices, e.g.
+                ".sp_cache" (optional; disabled by default)
         """
         if n_neurons < 1:
             raise ValueError("Must have at least 1 neuron")
@@ -382,20 +874,25 @@ class NeuralEncoder:
 
         self.n_neurons = n_neurons
         self.dim = sp_dimensionality
+        self.dtype = np.dtype(dtype)
 
         # Set random seed if provided
         if seed is not None:
             np.random.seed(seed)
 
         # Generate random encoder directions (preferred directions for each neuron)
-        self.encoders = np.random.randn(n_neurons, sp_dimensionality)
-        # Normalize to unit vectors
-        self.encoders = self.encoders / np.linalg.norm(self.encoders, axis=1, keepdims=True)
+        encoders = np.random.randn(n_neurons, sp_dimensionality)
+        # Normalize to unit vectors (in double precision, then stored in dtype)
+        encoders /= np.linalg.norm(encoders, axis=1, keepdims=True)
+        self.encoders = _aligned_empty(encoders.shape, self.dtype)
+        self.encoders[:] = encoders
 
         # Decoders computed lazily
         self._decoders: Optional[np.ndarray] = None
+        self.cache_dir = cache_dir
 
-    def encode(self, semantic_pointer: np.ndarray, gain: float = 1.0, bias: float = 0.0) -> np.ndarray:
+    def encode(self, semantic_pointer: np.ndarray, gain: float = 1.0, bias: float = 0.0,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Encode a semantic pointer as neural firing rates.
 
@@ -405,63 +902,146 @@ class NeuralEncoder:
             semantic_pointer: The semantic pointer to encode (dim,)
             gain: Multiplicative scaling factor (default 1.0)
             bias: Additive offset (default 0.0)
+            out: Optional preallocated output (n_neurons,) in the encoder
+                dtype, C-contiguous; reused across calls in real-time loops
 
         Returns:
-            np.ndarray: Firing rates for each neuron (n_neurons,)
+            np.ndarray: Firing rates for each neuron (n_neurons,); ``out``
+                if given
+
+        Example:
+            >>> rates = np.empty(encoder.n_neurons, dtype=encoder.dtype)
+            >>> encoder.encode(sp_vector, out=rates)
         """
         if len(semantic_pointer) != self.dim:
             raise ValueError(f"Semantic pointer dimension {len(semantic_pointer)} != {self.dim}")
 
         # Project semantic pointer onto each neuron's preferred direction
-        # firing_rate[i] = gain * dot(semantic_pointer, encoder[i]) + bias
-        firing_rates = gain * (self.encoders @ semantic_pointer) + bias
+        # firing_rate[i] = gain * dot(semantic_pointer, encoder[i]) + bias,
+        # computed in a single buffer
+        semantic_pointer = np.asarray(semantic_pointer, dtype=self.dtype)
+        firing_rates = np.dot(self.encoders, semantic_pointer, out=out)
+        if gain != 1.0:
+            firing_rates *= gain
+        if bias != 0.0:
+            firing_rates += bias
 
         # Apply ReLU (neurons can't have negative firing rates)
-        firing_rates = np.maximum(0, firing_rates)
+        return np.maximum(firing_rates, 0, out=firing_rates)
 
-        return firing_rates
+    def encode_batch(self, semantic_pointers: np.ndarray, gain: float = 1.0,
+                     bias: float = 0.0) -> np.ndarray:
+        """
+        Encode a batch of semantic pointers with a single matrix product.
+
+        Args:
+            semantic_pointers: Semantic pointers to encode (batch × dim)
+            gain: Multiplicative scaling factor (default 1.0)
+            bias: Additive offset (default 0.0)
+
+        Returns:
+            np.ndarray: Firing rates (batch × n_neurons)
+        """
+        semantic_pointers = np.asarray(semantic_pointers, dtype=self.dtype)
+        if semantic_pointers.ndim != 2 or semantic_pointers.shape[1] != self.dim:
+            raise ValueError(
+                f"Semantic pointer batch shape {semantic_pointers.shape} "
+                f"doesn't match dimension {self.dim}"
+            )
+
+        firing_rates = gain * (semantic_pointers @ self.encoders.T) + bias
+        return np.maximum(firing_rates, 0, out=firing_rates)
 
     @property
     def decoders(self) -> np.ndarray:
         """
         Get optimal decoding weights (computed lazily).
 
-        Decoders are the pseudo-inverse of encoders, providing the optimal
-        linear reconstruction of semantic pointers from firing rates.
+        Decoders are the least-squares solution mapping firing rates back to
+        semantic pointers. They are solved once on first access and cached,
+        so decode() is a single matrix-vector product. With a cache_dir they
+        are also loaded from / saved to disk, keyed on the encoder matrix.
 
         Returns:
             np.ndarray: Decoding matrix (dim × n_neurons)
         """
         if self._decoders is None:
-            self._decoders = self._compute_decoders()
+            if self.cache_dir is None:
+                self._decoders = self._compute_decoders()
+            else:
+                self._decoders = self._load_or_compute_decoders()
         return self._decoders
 
+    def _decoder_cache_path(self) -> str:
+        """Cache file for this encoder's decoders, keyed on the encoder matrix."""
+        digest = hashlib.sha1(self.encoders.tobytes()).hexdigest()[:16]
+        name = f"decoders_{self.n_neurons}x{self.dim}_{self.dtype.name}_{digest}.npy"
+        return os.path.join(self.cache_dir, name)
+
+    def _load_or_compute_decoders(self) -> np.ndarray:
+        """Load decoders from cache_dir, or solve them and write the cache file."""
+        path = self._decoder_cache_path()
+        try:
+            cached = np.load(path)
+        except (OSError, ValueError):
+            cached = None  # Missing or unreadable cache file
+
+        if cached is not None and cached.shape == (self.dim, self.n_neurons):
+            decoders = _aligned_empty(cached.shape, self.dtype)
+            decoders[:] = cached
+            return decoders
+
+        decoders = self._compute_decoders()
+
+        # Write to a temporary file first so concurrent readers never see a
+        # partial cache entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, decoders)
+        os.replace(tmp_path, path)
+        return decoders
+
     def _compute_decoders(self, n_samples: int = 1000, noise: float = 0.1) -> np.ndarray:
         """
-        Compute optimal decoding weights using least-squares regression.
+        Compute optimal decoding weights using ridge regression.
+
+        Firing-rate noise of standard deviation ``noise`` is accounted for
+        analytically: it adds ``noise**2 * n_samples`` to the diagonal of the
+        Gram matrix, and the resulting (n_neurons × n_neurons) normal
+        equations are solved by Cholesky factorization.
 
         Args:
             n_samples: Number of sample semantic pointers for training
-            noise: Amount of noise to add to firing rates (regularization)
+            noise: Standard deviation of firing-rate noise (regularization)
 
         Returns:
             np.ndarray: Decoding matrix (dim × n_neurons)
         """
-        # Generate random sample semantic pointers
-        samples = np.random.randn(n_samples, self.dim)
-        samples = samples / np.linalg.norm(samples, axis=1, keepdims=True)
-
-        # Encode each sample
-        activities = np.array([self.encode(sample) for sample in samples])
-
-        # Add noise for regularization
-        activities = activities + noise * np.random.randn(*activities.shape)
-
-        # Solve least-squares: activities @ decoders.T ≈ samples
-        # decoders = (activities.T @ activities)^-1 @ activities.T @ samples
-        decoders = np.linalg.lstsq(activities, samples, rcond=None)[0].T
+        # Generate random unit sample pointers. The Generator's ziggurat sampler
+        # is about twice as fast as np.random.randn; seeding it from the global
+        # stream keeps decoders reproducible under np.random.seed
+        rng = np.random.default_rng(np.random.randint(2 ** 31))
+        samples = _normalize_rows(rng.standard_normal((n_samples, self.dim)))
+
+        # Encode all samples with one matrix product; the solve itself runs
+        # in double precision and only the result is stored in dtype
+        activities = self.encode_batch(samples).astype(np.float64)
+
+        # Ridge normal equations: (A.T @ A + noise² n I) @ decoders.T = A.T @ samples
+        gram = activities.T @ activities
+        gram.flat[::self.n_neurons + 1] += noise ** 2 * n_samples
+        targets = activities.T @ samples
+
+        if cho_factor is not None:
+            decoders = cho_solve(cho_factor(gram, lower=True), targets)
+        else:
+            decoders = np.linalg.solve(gram, targets)
 
-        return decoders
+        # Row-major (aligned) copy so decode() reads each decoder row contiguously
+        result = _aligned_empty((self.dim, self.n_neurons), self.dtype)
+        result[:] = decoders.T
+        return result
 
     def decode(self, firing_rates: np.ndarray) -> np.ndarray:
         """
@@ -476,15 +1056,28 @@ class NeuralEncoder:
         if len(firing_rates) != self.n_neurons:
             raise ValueError(f"Expected {self.n_neurons} firing rates, got {len(firing_rates)}")
 
-        # Linear decoding: sp = decoders @ firing_rates
-        recovered = self.decoders @ firing_rates
+        # Linear decoding: sp = decoders @ firing_rates, normalized to unit length
+        return normalize_inplace(self.decoders @ firing_rates)
+
+    def decode_batch(self, firing_rates: np.ndarray) -> np.ndarray:
+        """
+        Decode a batch of firing-rate vectors with a single matrix product.
+
+        Args:
+            firing_rates: Neural activity (batch × n_neurons)
 
-        # Normalize to unit vector
-        norm = np.linalg.norm(recovered)
-        if norm > 1e-10:
-            recovered = recovered / norm
+        Returns:
+            np.ndarray: Recovered semantic pointers (batch × dim), each row
+                normalized
+        """
+        firing_rates = np.asarray(firing_rates)
+        if firing_rates.ndim != 2 or firing_rates.shape[1] != self.n_neurons:
+            raise ValueError(
+                f"Expected firing rates of shape (batch, {self.n_neurons}), "
+                f"got {firing_rates.shape}"
+            )
 
-        return recovered
+        return _normalize_rows(firing_rates @ self.decoders.T)
 
     def __repr__(self) -> str:
         return f"NeuralEncoder(n_neurons={self.n_neurons}, dim={self.dim})"
@@ -501,6 +1094,11 @@ class SemanticWeightGenerator:
     Creates connection weights between neural populations that perform
     transformations in semantic pointer space (identity, binding, unbinding).
 
+    Identity weights are computed once per generator. Binding and unbinding
+    weights requested by vector are cached per generator, keyed on the
+    vector's contents (the WEIGHT_CACHE_SIZE most recently used of each).
+    Cached matrices are returned read-only.
+
     Attributes:
         enc_src: Encoder for source population
         enc_tgt: Encoder for target population
@@ -516,6 +1114,9 @@ class SemanticWeightGenerator:
         Eliasmith (2013), Chapter 6: "Implementing transformations"
     """
 
+    # Weight matrices kept per operation before the least recently used is evicted
+    WEIGHT_CACHE_SIZE = 32
+
     def __init__(self, encoder_src: NeuralEncoder, encoder_tgt: NeuralEncoder):
         """
         Initialize weight generator.
@@ -531,93 +1132,144 @@ class SemanticWeightGenerator:
 
         self.enc_src = encoder_src
         self.enc_tgt = encoder_tgt
+        self._bind_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._unbind_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._identity: Optional[np.ndarray] = None
 
     def identity_weights(self) -> np.ndarray:
         """
         Generate weights that pass semantic pointer unchanged: B = A.
 
+        Computed once per generator and returned read-only.
+
         Returns:
             np.ndarray: Weight matrix (n_tgt × n_src)
         """
-        # W = encoders_tgt @ decoders_src
-        # This projects from source space → semantic space → target space
-        return self.enc_tgt.encoders @ self.enc_src.decoders
-
-    def binding_weights(self, bind_with_vector: np.ndarray) -> np.ndarray:
+        if self._identity is None:
+            # W = encoders_tgt @ decoders_src
+            # This projects from source space → semantic space → target space
+            W = self.enc_tgt.encoders @ self.enc_src.decoders
+            W.flags.writeable = False
+            self._identity = W
+        return self._identity
+
+    def precompute_dft(self, vector: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generate weights that bind with a fixed vector: B = A ⊛ V.
+        Compute the spectra used to bind and unbind with a fixed vector.
+
+        Binding and unbinding with the same vector share one FFT: pass the
+        result as ``dft=`` to both binding_weights() and unbinding_weights().
 
         Args:
-            bind_with_vector: Semantic pointer to bind with (dim,)
+            vector: Semantic pointer to bind/unbind with (dim,)
 
         Returns:
-            np.ndarray: Weight matrix (n_tgt × n_src)
+            Tuple of (F, F_conj): the real FFT of the vector (convolution)
+            and its complex conjugate (correlation)
+
+        Example:
+            >>> dft = gen.precompute_dft(vocab.get("CIRCLE"))
+            >>> W_bind = gen.binding_weights(dft=dft)
+            >>> W_unbind = gen.unbinding_weights(dft=dft)
         """
-        if len(bind_with_vector) != self.enc_src.dim:
+        if len(vector) != self.enc_src.dim:
             raise ValueError(
-                f"Vector dimension {len(bind_with_vector)} != {self.enc_src.dim}"
+                f"Vector dimension {len(vector)} != {self.enc_src.dim}"
             )
 
-        # Create transformation matrix for circular convolution
-        transform = self._circular_conv_matrix(bind_with_vector)
+        spectrum = _fft.rfft(np.asarray(vector, dtype=self.enc_src.dtype))
+        return spectrum, np.conj(spectrum)
 
-        # W = encoders_tgt @ transform @ decoders_src
-        return self.enc_tgt.encoders @ transform @ self.enc_src.decoders
-
-    def unbinding_weights(self, unbind_vector: np.ndarray) -> np.ndarray:
+    def binding_weights(
+        self,
+        bind_with_vector: Optional[np.ndarray] = None,
+        dft: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> np.ndarray:
         """
-        Generate weights that unbind: B = A ⊛ V'.
+        Generate weights that bind with a fixed vector: B = A ⊛ V.
 
         Args:
-            unbind_vector: Semantic pointer to unbind with (dim,)
+            bind_with_vector: Semantic pointer to bind with (dim,)
+            dft: Spectra from precompute_dft(), used instead of the vector
 
         Returns:
-            np.ndarray: Weight matrix (n_tgt × n_src)
+            np.ndarray: Weight matrix (n_tgt × n_src); read-only when
+                requested by vector (shared with later calls)
         """
-        if len(unbind_vector) != self.enc_src.dim:
-            raise ValueError(
-                f"Vector dimension {len(unbind_vector)} != {self.enc_src.dim}"
-            )
-
-        # Create transformation matrix for circular correlation
-        transform = self._circular_corr_matrix(unbind_vector)
+        if dft is None:
+            if bind_with_vector is None:
+                raise ValueError("Provide bind_with_vector or dft")
+            return self._cached_weights(self._bind_cache, bind_with_vector, 0)
 
-        # W = encoders_tgt @ transform @ decoders_src
-        return self.enc_tgt.encoders @ transform @ self.enc_src.decoders
+        # W = encoders_tgt @ (V ⊛ decoders_src), convolution done per column
+        return self.enc_tgt.encoders @ self._apply_spectrum(dft[0])
 
-    def _circular_conv_matrix(self, vector: np.ndarray) -> np.ndarray:
+    def unbinding_weights(
+        self,
+        unbind_vector: Optional[np.ndarray] = None,
+        dft: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> np.ndarray:
         """
-        Create circulant matrix for circular convolution with a fixed vector.
+        Generate weights that unbind: B = A ⊛ V'.
 
         Args:
-            vector: Semantic pointer to convolve with
+            unbind_vector: Semantic pointer to unbind with (dim,)
+            dft: Spectra from precompute_dft(), used instead of the vector
 
         Returns:
-            np.ndarray: Circulant matrix (dim × dim)
+            np.ndarray: Weight matrix (n_tgt × n_src); read-only when
+                requested by vector (shared with later calls)
         """
-        dim = len(vector)
-        # Create circulant matrix where each row is a circular shift of vector
-        matrix = np.zeros((dim, dim))
-        for i in range(dim):
-            matrix[i, :] = np.roll(vector, i)
-        return matrix
+        if dft is None:
+            if unbind_vector is None:
+                raise ValueError("Provide unbind_vector or dft")
+            return self._cached_weights(self._unbind_cache, unbind_vector, 1)
+
+        # W = encoders_tgt @ (V' ⊛ decoders_src), correlation via conj spectrum
+        return self.enc_tgt.encoders @ self._apply_spectrum(dft[1])
 
-    def _circular_corr_matrix(self, vector: np.ndarray) -> np.ndarray:
+    def _cached_weights(self, cache: "OrderedDict[bytes, np.ndarray]",
+                        vector: np.ndarray, which: int) -> np.ndarray:
         """
-        Create circulant matrix for circular correlation with a fixed vector.
+        Look up or compute binding (which=0) or unbinding (which=1) weights.
 
-        Correlation is the inverse operation of convolution, implemented
-        by reversing the vector (except first element).
+        Keys are the vector's bytes in the encoder dtype, so equal vectors
+        hit regardless of the caller's array object.
+        """
+        key = np.asarray(vector, dtype=self.enc_src.dtype).tobytes()
+        W = cache.get(key)
+        if W is not None:
+            cache.move_to_end(key)
+            return W
+
+        W = self.enc_tgt.encoders @ self._apply_spectrum(self.precompute_dft(vector)[which])
+        W.flags.writeable = False
+        cache[key] = W
+        if len(cache) > self.WEIGHT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return W
+
+    def _apply_spectrum(self, spectrum: np.ndarray) -> np.ndarray:
+        """
+        Apply a circular transform, given by its spectrum, to the source decoders.
+
+        Equivalent to ``circulant_matrix @ decoders_src`` without building the
+        (dim × dim) matrix: each decoder column is filtered in the frequency
+        domain.
 
         Args:
-            vector: Semantic pointer to correlate with
+            spectrum: Real-FFT spectrum of the transform (dim // 2 + 1,)
 
         Returns:
-            np.ndarray: Circulant matrix (dim × dim)
+            np.ndarray: Transformed decoders (dim × n_src)
         """
-        # Circular correlation uses reversed vector (except first element)
-        reversed_vector = np.concatenate([[vector[0]], vector[1:][::-1]])
-        return self._circular_conv_matrix(reversed_vector)
+        dim = self.enc_src.dim
+        if len(spectrum) != dim // 2 + 1:
+            raise ValueError(
+                f"Spectrum length {len(spectrum)} != {dim // 2 + 1} for dimension {dim}"
+            )
+
+        return _convolve_columns(self.enc_src.decoders, spectrum)
 
     def __repr__(self) -> str:
         return (f"SemanticWeightGenerator("
@@ -688,8 +1340,16 @@ class CleanupMemory:
         self.dim = vocabulary.dim
         self.threshold = threshold
 
-        # Compute Hopfield weight matrix from vocabulary
+        # Compute Hopfield weight matrix from vocabulary; version records
+        # which vocabulary state the attractors were built from
         self.weights = self._compute_hopfield_weights()
+        self.version = vocabulary.version
+
+        # Row-normalized vocabulary for nearest-match queries, rebuilt when
+        # the vocabulary's version changes
+        self._match_version: Optional[int] = None
+        self._names: List[str] = []
+        self._V_norm: Optional[np.ndarray] = None
 
     def _compute_hopfield_weights(self) -> np.ndarray:
         """
@@ -699,26 +1359,32 @@ class CleanupMemory:
         Self-connections are removed by setting diagonal to zero.
 
         Returns:
-            np.ndarray: Weight matrix (dim × dim)
+            np.ndarray: Weight matrix (dim × dim), in the vocabulary dtype
         """
-        W = np.zeros((self.dim, self.dim))
-
-        # Sum outer products of all vocabulary vectors
-        for name in self.vocab.vectors:
-            v = self.vocab.get(name)
-            W += np.outer(v, v)
+        # Sum of outer products of all vocabulary vectors as one GEMM over
+        # the stacked vocabulary (V × dim): W = V.T @ V, written into a
+        # contiguous aligned buffer since the cleanup kernel reads rows of W
+        V = self.vocab.matrix
+        W = np.matmul(V.T, V, out=_aligned_empty((self.dim, self.dim), V.dtype))
 
         # Remove self-connections (standard Hopfield)
         np.fill_diagonal(W, 0)
-
         return W
 
+    def _match_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """Return vocabulary names and their unit-norm rows (V × dim), cached."""
+        if self._match_version != self.vocab.version:
+            self._names = list(self.vocab.vectors)
+            self._V_norm = _normalize_rows(self.vocab.matrix.copy())
+            self._match_version = self.vocab.version
+        return self._names, self._V_norm
+
     def cleanup(
         self,
         noisy_vector: np.ndarray,
         max_iterations: int = 100,
         return_trajectory: bool = False
-    ) -> Union[np.ndarray, Tuple[np.ndarray, List[np.ndarray], int]]:
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray, int]]:
         """
         Clean up a noisy semantic pointer via attractor dynamics.
 
@@ -736,7 +1402,9 @@ class CleanupMemory:
             If return_trajectory is False:
                 Cleaned semantic pointer (normalized)
             If return_trajectory is True:
-                Tuple of (cleaned_vector, trajectory_list, num_iterations)
+                Tuple of (cleaned_vector, trajectory, num_iterations), where
+                trajectory is a (num_iterations + 1, dim) array whose rows
+                are the states visited, initial state first
 
         Raises:
             ValueError: If vector dimension doesn't match vocabulary
@@ -754,42 +1422,96 @@ class CleanupMemory:
                 f"vocabulary dimension {self.dim}"
             )
 
-        # Initialize state
-        x = noisy_vector.copy()
-        trajectory = [x.copy()] if return_trajectory else []
+        # Iterative settling runs in a compiled kernel (NumPy fallback
+        # without numba); returns the best result even if not converged.
+        # Only the trajectory variant keeps every visited state.
+        x0 = np.ascontiguousarray(noisy_vector, dtype=self.weights.dtype)
+        if not return_trajectory:
+            x, _ = settle(self.weights, x0, self.threshold, max_iterations)
+            return x
 
-        # Iterative settling
-        for iteration in range(max_iterations):
-            # Apply attractor dynamics: x_new = tanh(W @ x)
-            x_new = np.tanh(self.weights @ x)
+        x, trajectory, n_iters = cleanup_trajectory(
+            self.weights, x0, self.threshold, max_iterations
+        )
+        return x, trajectory, int(n_iters)
 
-            # Normalize to maintain unit vector
-            norm = np.linalg.norm(x_new)
-            if norm > 1e-10:  # Avoid division by zero
-                x_new = x_new / norm
-            else:
-                # Degenerate case: reset to noisy vector
-                x_new = noisy_vector / np.linalg.norm(noisy_vector)
-
-            # Track trajectory if requested
-            if return_trajectory:
-                trajectory.append(x_new.copy())
-
-            # Check convergence
-            change = np.linalg.norm(x_new - x)
-            if change < self.threshold:
-                if return_trajectory:
-                    return x_new, trajectory, iteration + 1
-                else:
-                    return x_new
-
-            x = x_new
-
-        # Return best result even if didn't converge
-        if return_trajectory:
-            return x, trajectory, max_iterations
-        else:
-            return x
+    def cleanup_batch(
+        self,
+        noisy_vectors: np.ndarray,
+        max_iterations: int = 100,
+        backend: str = "numpy"
+    ) -> np.ndarray:
+        """
+        Clean up a batch of noisy semantic pointers at once.
+
+        Runs the same dynamics as cleanup() for every row, but each iteration
+        updates all still-settling rows with a single matrix product. Rows
+        stop updating as soon as they individually converge, so each result
+        matches what cleanup() returns for that row.
+
+        With backend="jax" the whole settling loop is compiled into one XLA
+        program (jax.lax.while_loop) and can run on a GPU. A single row
+        always takes the NumPy path.
+
+        Args:
+            noisy_vectors: Array of shape (batch, dim)
+            max_iterations: Maximum number of settling iterations (default: 100)
+            backend: "numpy" (default) or "jax"
+
+        Returns:
+            np.ndarray: Cleaned semantic pointers, shape (batch, dim)
+
+        Raises:
+            ValueError: If the array is not 2D or its width doesn't match
+                the vocabulary dimension, or the backend is unknown
+            ImportError: If backend="jax" but JAX is not installed
+
+        Example:
+            >>> noisy = np.stack([vocab.get("RED"), vocab.get("BLUE")])
+            >>> noisy += 0.5 * np.random.randn(*noisy.shape)
+            >>> cleaned = cleanup.cleanup_batch(noisy)
+        """
+        noisy_vectors = np.asarray(noisy_vectors)
+        if noisy_vectors.ndim != 2 or noisy_vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Batch shape {noisy_vectors.shape} doesn't match "
+                f"vocabulary dimension {self.dim}"
+            )
+        if backend not in ("numpy", "jax"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'numpy' or 'jax'")
+        if backend == "jax" and not HAVE_JAX:
+            raise ImportError("backend='jax' requires JAX to be installed")
+
+        # Settle in the weights' dtype, as cleanup() does
+        x0 = np.asarray(noisy_vectors, dtype=self.weights.dtype)
+        if backend == "jax" and len(x0) > 1:
+            return np.asarray(settle_batch_jax(self.weights, x0, self.threshold,
+                                               max_iterations))
+
+        x = x0.copy()
+        active = np.arange(len(x))
+
+        for _ in range(max_iterations):
+            if active.size == 0:
+                break
+
+            # Apply attractor dynamics to every unsettled row at once
+            x_new = np.tanh(x[active] @ self.weights.T)
+
+            # Normalize rows; degenerate rows reset to their noisy input
+            norms = np.linalg.norm(x_new, axis=1)
+            ok = norms > 1e-10
+            x_new[ok] /= norms[ok, None]
+            if not ok.all():
+                reset = x0[active[~ok]]
+                x_new[~ok] = reset / np.linalg.norm(reset, axis=1, keepdims=True)
+
+            # Drop converged rows from the active set
+            change = np.linalg.norm(x_new - x[active], axis=1)
+            x[active] = x_new
+            active = active[change >= self.threshold]
+
+        return x
 
     def find_nearest_match(self, vector: np.ndarray) -> Tuple[str, float]:
         """
@@ -799,7 +1521,8 @@ class CleanupMemory:
             vector: Semantic pointer to match against vocabulary
 
         Returns:
-            Tuple of (name, similarity_score) for the nearest match
+            Tuple of (name, similarity_score) for the nearest match, where
+            the score is the cosine similarity
 
         Raises:
             ValueError: If vector dimension doesn't match vocabulary
@@ -816,18 +1539,49 @@ class CleanupMemory:
                 f"vocabulary dimension {self.dim}"
             )
 
-        best_name = None
-        best_similarity = -1.0
+        # Score every vocabulary entry in one pass (parallel with numba)
+        names, V_norm = self._match_matrix()
+        query = normalize_inplace(np.array(vector, dtype=V_norm.dtype))
+        best, similarity = nearest_match(V_norm, query)
+
+        return names[best], float(similarity)
+
+    def find_nearest_match_batch(
+        self,
+        vectors: np.ndarray
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Find the nearest vocabulary vector for every row of a batch.
+
+        All similarities are computed with one matrix product against the
+        cached row-normalized vocabulary.
+
+        Args:
+            vectors: Array of shape (batch, dim)
+
+        Returns:
+            Tuple of (names, similarities): the nearest vocabulary name for
+            each row and the corresponding cosine similarities (batch,)
+
+        Raises:
+            ValueError: If the array is not 2D or its width doesn't match
+                the vocabulary dimension
+        """
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Batch shape {vectors.shape} doesn't match "
+                f"vocabulary dimension {self.dim}"
+            )
 
-        for name in self.vocab.vectors:
-            vocab_vec = self.vocab.get(name)
-            similarity = cosine_similarity(vector, vocab_vec)
+        names, V_norm = self._match_matrix()
+        queries = _normalize_rows(np.array(vectors, dtype=V_norm.dtype))
 
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_name = name
+        similarities = queries @ V_norm.T
+        best = similarities.argmax(axis=1)
 
-        return best_name, best_similarity
+        return ([names[k] for k in best],
+                similarities[np.arange(len(vectors)), best])
 
     def get_weights(self) -> np.ndarray:
         """
@@ -6,15 +6,14 @@ Supports interactive parameter adjustment and visualization.
 """
 import asyncio
 import json
-import queue
-import threading
-import time
+import logging
+import os
 
 import numpy as np
 import websockets
 from brian2 import (
-    Network, NeuronGroup, PoissonInput, SpikeMonitor, StateMonitor,
-    Synapses, collect, defaultclock, ms, prefs, start_scope, Hz
+    BrianLogger, Network, NeuronGroup, PoissonInput, SpikeMonitor,
+    StateMonitor, Synapses, collect, defaultclock, ms, prefs, start_scope, Hz
 )
 
 # Semantic Pointer imports
@@ -27,7 +26,54 @@ from scripts.semantic_algebra import (
 # Basal Ganglia imports
 from scripts.basal_ganglia import BasalGangliaActionSelection
 
-prefs.codegen.target = "numpy"
+# Compiled connectivity kernel (NumPy fallback without Numba)
+from scripts._kernels import cluster_connect
+
+# Optional: orjson encodes frames in C and handles NumPy scalars/arrays
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _json_default(obj):
+    """Convert NumPy arrays and scalars for the standard library encoder."""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj):
+    """
+    Serialize a message to a JSON text frame.
+
+    Uses orjson when available, otherwise the standard library encoder.
+    NumPy arrays (C-contiguous) and scalars may be passed as-is either way.
+
+    Args:
+        obj: JSON-serializable object, possibly containing NumPy values
+
+    Returns:
+        str: Encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, default=_json_default)
+
+
+logger = logging.getLogger(__name__)
+
+# Per-command and per-step messages are logged at DEBUG; set
+# BRAIN_SERVER_DEBUG=1 to see them (and Brian2's warnings)
+DEBUG = os.environ.get("BRAIN_SERVER_DEBUG", "") == "1"
+
+# Compiled (Cython) state updates when a compiler is available, otherwise
+# Brian2 falls back to the NumPy target
+prefs.codegen.target = "auto"
+
+if not DEBUG:
+    BrianLogger.suppress_name('base')
+    logging.getLogger('brian2').setLevel(logging.ERROR)
 
 # Server configuration
 PORT = 8766
@@ -37,6 +83,20 @@ NETWORK_MODE = "simple"  # "simple" or "realistic"
 # UI control state
 CTRL = {"paused": False, "dt_ms": 50}
 
+# Generator for server-side random draws (input noise, connectivity,
+# stimulus choice, SP noise); set BRAIN_SERVER_SEED for reproducible runs
+_seed = os.environ.get("BRAIN_SERVER_SEED")
+RNG = np.random.default_rng(int(_seed) if _seed else None)
+
+# Simulated time (seconds) after which brain_loop restarts the spike monitor
+SPIKE_MONITOR_WINDOW = 10.0
+
+# Voltage streaming: a full "volt" keyframe every VOLT_KEYFRAME_INTERVAL
+# frames, otherwise a sparse "voltDelta" of neurons whose voltage moved by
+# more than VOLT_DELTA_EPS since the value last sent for them
+VOLT_KEYFRAME_INTERVAL = 20
+VOLT_DELTA_EPS = 0.02
+
 # Neuron count variables (initialized for realistic mode)
 N_exc = 0
 N_inh = 0
@@ -137,6 +197,13 @@ class SemanticPointer:
         self.dim = dim
         self.n_neurons = n_neurons_per_pool
         self.cleanup_memory = None  # CleanupMemory (initialized on first use)
+        # Results of noise/cleanup commands: stored in the vocabulary but
+        # never used as cleanup attractors
+        self.derived_names = set()
+        self._cleanup_source = None  # (names, vectors) the attractors came from
+        # (from_pool, to_pool) -> SemanticWeightGenerator; each generator
+        # caches its identity weights and the most recent bind/unbind weights
+        self._weight_gens = {}
 
     def create_pool(self, name):
         """
@@ -149,14 +216,17 @@ class SemanticPointer:
             NeuralEncoder: Encoder for this pool
         """
         if name in self.encoders:
-            print(f"⚠ Pool '{name}' already exists")
+            logger.warning("⚠ Pool '%s' already exists", name)
             return self.encoders[name]
 
         self.encoders[name] = NeuralEncoder(
             n_neurons=self.n_neurons,
             sp_dimensionality=self.dim
         )
-        print(f"✓ Created SP pool '{name}' ({self.n_neurons} neurons, {self.dim}D)")
+        logger.debug(
+            "✓ Created SP pool '%s' (%s neurons, %sD)",
+            name, self.n_neurons, self.dim
+        )
         return self.encoders[name]
 
     def set_input(self, pool_name, sp_vector, neuron_group):
@@ -176,7 +246,10 @@ class SemanticPointer:
 
         # Scale to match Brian2 input current range
         neuron_group.I_input = firing_rates * PARAMS["input_current"] * 10
-        print(f"✓ Set input for pool '{pool_name}' (mean rate: {firing_rates.mean():.2f})")
+        logger.debug(
+            "✓ Set input for pool '%s' (mean rate: %.2f)",
+            pool_name, firing_rates.mean()
+        )
 
     def connect_pools(self, from_pool, to_pool, operation="identity", bind_vector=None):
         """
@@ -189,7 +262,8 @@ class SemanticPointer:
             bind_vector: Vector to bind/unbind with (required for bind/unbind)
 
         Returns:
-            np.ndarray: Weight matrix (n_tgt × n_src)
+            np.ndarray: Weight matrix (n_tgt × n_src), read-only and shared
+            between calls with the same pools, operation and bind vector
         """
         if from_pool not in self.encoders:
             raise ValueError(f"Source pool '{from_pool}' not found")
@@ -199,21 +273,34 @@ class SemanticPointer:
         enc_from = self.encoders[from_pool]
         enc_to = self.encoders[to_pool]
 
-        weight_gen = SemanticWeightGenerator(enc_from, enc_to)
+        key = (from_pool, to_pool)
+        weight_gen = self._weight_gens.get(key)
+        if weight_gen is None:
+            weight_gen = SemanticWeightGenerator(enc_from, enc_to)
+            self._weight_gens[key] = weight_gen
 
         if operation == "identity":
             W = weight_gen.identity_weights()
-            print(f"✓ Generated identity weights: {from_pool} → {to_pool}")
+            logger.debug(
+                "✓ Generated identity weights: %s → %s",
+                from_pool, to_pool
+            )
         elif operation == "bind":
             if bind_vector is None:
                 raise ValueError("bind_vector required for bind operation")
             W = weight_gen.binding_weights(bind_vector)
-            print(f"✓ Generated binding weights: {from_pool} → {to_pool}")
+            logger.debug(
+                "✓ Generated binding weights: %s → %s",
+                from_pool, to_pool
+            )
         elif operation == "unbind":
             if bind_vector is None:
                 raise ValueError("bind_vector required for unbind operation")
             W = weight_gen.unbinding_weights(bind_vector)
-            print(f"✓ Generated unbinding weights: {from_pool} → {to_pool}")
+            logger.debug(
+                "✓ Generated unbinding weights: %s → %s",
+                from_pool, to_pool
+            )
         else:
             raise ValueError(f"Unknown operation: {operation}")
 
@@ -221,26 +308,111 @@ class SemanticPointer:
 
     def initialize_cleanup(self):
         """
-        Initialize cleanup memory from current vocabulary.
+        Initialize cleanup memory from the concepts in the vocabulary.
+
+        Attractors are built from a copy of every vector except the
+        derived (noisy or cleaned) ones, so cleanup converges to concepts.
 
         Returns:
             dict: Status information about initialized cleanup
 
         Raises:
-            ValueError: If vocabulary is empty
+            ValueError: If vocabulary has no concepts
         """
-        if len(self.vocab.vectors) == 0:
+        names = self._concept_names()
+        if not names:
             raise ValueError("Cannot initialize cleanup with empty vocabulary")
 
-        self.cleanup_memory = CleanupMemory(self.vocab)
-        print(f"✓ Initialized cleanup memory with {len(self.vocab.vectors)} concepts")
+        vectors = np.stack([self.vocab.get(name) for name in names])
+        concepts = SemanticVocabulary(dimensionality=self.dim, dtype=self.vocab.dtype)
+        for name, vector in zip(names, vectors):
+            concepts.add(name, vector)
+        self.cleanup_memory = CleanupMemory(concepts)
+        self._cleanup_source = (names, vectors)
+        logger.debug("✓ Initialized cleanup memory with %s concepts", len(names))
 
         return {
             "status": "initialized",
-            "vocab_size": len(self.vocab.vectors),
+            "vocab_size": len(names),
             "dimension": self.dim
         }
 
+    def ensure_cleanup(self):
+        """
+        Return the cleanup memory, rebuilding it only when concepts changed.
+
+        Storing noisy or cleaned vectors does not trigger a rebuild; adding
+        a concept or overwriting one (e.g. a repeated bind) does.
+
+        Returns:
+            CleanupMemory: Cleanup memory over the current concepts
+        """
+        names = self._concept_names()
+        source = self._cleanup_source
+        if (self.cleanup_memory is None or source is None or source[0] != names or
+                not np.array_equal(source[1], [self.vocab.get(name) for name in names])):
+            self.initialize_cleanup()
+        return self.cleanup_memory
+
+    def _concept_names(self):
+        """Vocabulary names usable as attractors, in insertion order."""
+        return [name for name in self.vocab.vectors if name not in self.derived_names]
+
+
+def build_recurrent_synapses(group):
+    """
+    Randomly connect a group to itself with a per-synapse weight variable.
+
+    The weight lives in the synapses' ``w`` variable rather than in the
+    on_pre code, so it can be changed without regenerating code.
+
+    Args:
+        group: NeuronGroup to connect recurrently
+
+    Returns:
+        Synapses: Connected synapses with w set to PARAMS["synapse_weight"]
+    """
+    syn = Synapses(group, group, 'w : 1', on_pre='v += w')
+    syn.connect(p=PARAMS["connection_prob"])
+    syn.w = PARAMS["synapse_weight"]
+    return syn
+
+
+def apply_synapse_weight():
+    """
+    Write PARAMS["synapse_weight"] into the active network's synapses.
+
+    Updates weights in place; the network keeps its connectivity and
+    generated code. In realistic mode the excitatory pathways are scaled
+    as in create_realistic_network.
+    """
+    weight = PARAMS["synapse_weight"]
+    if NETWORK_MODE == "realistic":
+        S_ee.w = weight
+        S_ei.w = weight * 1.5
+    else:
+        S.w = weight
+
+
+def rewire_network():
+    """
+    Reconnect the simple network with PARAMS["connection_prob"].
+
+    Only the recurrent synapses are replaced; neurons, Poisson input and
+    monitors (and their state) are kept. The realistic network does not
+    use connection_prob, so in that mode the simple network is rebuilt
+    as before.
+
+    Updates global network objects: S
+    """
+    global S
+    if NETWORK_MODE != "simple":
+        recreate_network()
+        return
+    net.remove(S)
+    S = build_recurrent_synapses(G)
+    net.add(S)
+
 
 def recreate_network():
     """
@@ -276,8 +448,7 @@ def recreate_network():
     # Add continuous background noise to keep network active
     G.I_noise = f'{PARAMS["noise_level"]} * randn()'
 
-    S = Synapses(G, G, on_pre=f'v+={PARAMS["synapse_weight"]}')
-    S.connect(p=PARAMS["connection_prob"])
+    S = build_recurrent_synapses(G)
 
     # Add Poisson input to maintain baseline activity
     P = PoissonInput(G, 'I_input', NUM, 2*Hz, weight=0.03)
@@ -302,8 +473,9 @@ G.v = 'rand()*0.3'  # Lower initial voltages
 G.I_input = 0.1  # External input current
 G.I_noise = '0.05 + 0.02*randn()'  # Background noise
 
-S = Synapses(G, G, on_pre='v+=0.15')
+S = Synapses(G, G, 'w : 1', on_pre='v+=w')
 S.connect(p=0.08)
+S.w = 0.15
 
 # Add Poisson input for sustained activity
 P = PoissonInput(G, 'I_input', NUM, 2*Hz, weight=0.03)
@@ -311,7 +483,13 @@ sm = SpikeMonitor(G)
 vm = StateMonitor(G, 'v', record=True)
 net = Network(collect())
 
-q = queue.Queue()
+# Ring buffer of pending frames: bounded so a stalled consumer cannot grow
+# memory, and short so a client that falls behind (or reconnects) resumes
+# near the latest state; publish() drops the oldest frame when full.
+# Created by main() on the running loop: on Python < 3.10 a queue built at
+# import time binds to a different loop than asyncio.run() starts
+QUEUE_MAXSIZE = 8
+q = None
 
 # Global semantic pointer instance (initialized when SP mode is enabled)
 sp = None
@@ -320,20 +498,72 @@ sp = None
 bg = None
 
 
-def brain_loop():
+def publish(item):
+    """
+    Encode a frame and enqueue it, dropping the oldest one when full.
+
+    Frames are encoded here, once, so the queue holds compact immutable
+    text rather than dicts of arrays, tagged with whether the frame is a
+    voltage keyframe. Nothing is encoded while no client is connected.
+
+    Args:
+        item: JSON-serializable frame dict
+
+    Returns:
+        bool: True if the frame was discarded (no clients) or an older
+        frame was dropped to make room
+    """
+    if not clients:
+        return True
+    dropped = q.full()
+    if dropped:
+        q.get_nowait()
+    q.put_nowait(("volt" in item, _dumps(item)))
+    return dropped
+
+
+def reset_spike_monitor():
     """
-    Main simulation loop running in background thread.
+    Replace the spike monitor with an empty one on the same neurons.
+
+    Keeps the monitor's history from growing for the lifetime of the
+    server; brain_loop only ever reads spikes recorded since its last step.
+
+    Updates global network objects: sm
+
+    Returns:
+        SpikeMonitor: The new spike monitor
+    """
+    global sm
+    net.remove(sm)
+    sm = SpikeMonitor(sm.source)
+    net.add(sm)
+    return sm
+
+
+async def brain_loop():
+    """
+    Main simulation loop running as a task on the server's event loop.
 
     Continuously runs the Brian2 network simulation and pushes
     results (spikes and voltages) to the queue for WebSocket transmission.
+    Voltages go out as periodic full keyframes ("volt") with sparse
+    changes ("voltDelta") in between; a client joining mid-stream
+    requests an early keyframe.
 
     Respects pause state and adjustable simulation speed.
     Works with both simple and realistic network modes.
     """
+    global keyframe_requested
     last = 0
+    last_mon = None
+    window_start = 0.0
+    sent_v = None  # Voltages as clients know them (None forces a keyframe)
+    frames_since_key = 0
+    ms_inv = 1.0 / float(ms)
     while True:
         if CTRL["paused"]:
-            time.sleep(0.05)  # Responsive pause
+            await asyncio.sleep(0.05)  # Responsive pause
             continue
         try:
             # Use CTRL["dt_ms"] directly for simulation speed
@@ -344,35 +574,137 @@ def brain_loop():
             # Get monitors using adapter functions
             spike_mon = get_spike_monitor()
             volt_mon = get_voltage_monitor()
-            neuron_count = get_neuron_count()
-
-            i, t = spike_mon.i[:], spike_mon.t[:]
-            spikes = [
-                {"i": int(i[k]), "t": float(t[k]/ms)}
-                for k in range(last, len(i))
-            ]
-            last = len(i)
-            volt = {
-                str(r): float(volt_mon.v[r, -1])
-                for r in range(neuron_count)
+
+            if spike_mon is not last_mon:
+                # Network was rebuilt: read the new monitor from the start
+                last, last_mon, window_start = 0, spike_mon, float(net.t)
+
+            # Columnar spike packet: parallel lists of indices and times (ms),
+            # reading only the spikes recorded since the previous step
+            n_spikes = spike_mon.num_spikes
+            # (arrays are serialized directly by _dumps)
+            spikes = {
+                "i": np.asarray(spike_mon.i[last:n_spikes], dtype=np.int32),
+                "t": np.asarray(spike_mon.t[last:n_spikes]) * ms_inv
             }
-            q.put({
-                "t": float(defaultclock.t/ms),
-                "spikes": spikes,
-                "volt": volt
-            })
+            last = n_spikes
+
+            # Bound the monitor's memory by starting a fresh one periodically
+            if float(net.t) - window_start >= SPIKE_MONITOR_WINDOW:
+                last_mon = reset_spike_monitor()
+                last, window_start = 0, float(net.t)
+            # Latest voltage of every recorded neuron, indexed by position
+            volt = np.array(volt_mon.v[:, -1])
+            frame = {"t": float(defaultclock.t/ms), "spikes": spikes}
+            if keyframe_requested:
+                keyframe_requested = False
+                sent_v = None
+            if (sent_v is None or sent_v.shape != volt.shape or
+                    frames_since_key >= VOLT_KEYFRAME_INTERVAL - 1):
+                frame["volt"] = volt
+                sent_v = volt.copy()
+                frames_since_key = 0
+            else:
+                changed = np.flatnonzero(np.abs(volt - sent_v) > VOLT_DELTA_EPS)
+                sent_v[changed] = volt[changed]
+                frame["voltDelta"] = {
+                    "i": changed.astype(np.int32), "v": volt[changed]
+                }
+                frames_since_key += 1
+            if publish(frame):
+                # A discarded frame may have carried deltas: resync clients
+                sent_v = None
 
             # Sleep scales with speed for smooth control
             sleep_time = CTRL["dt_ms"] / 1000 * 0.2
-            time.sleep(max(0.01, sleep_time))
+            await asyncio.sleep(max(0.01, sleep_time))
+        except Exception as e:
+            logger.error("Brain loop error: %s", e)
+            await asyncio.sleep(0.01)
+
+
+# =============================================================================
+# Parameter Updates
+# =============================================================================
+
+# Slider-driven commands; bursts are coalesced so only the latest value of
+# each is applied, PARAM_DEBOUNCE seconds after the last one arrives
+DEBOUNCED_COMMANDS = ("speed", "setInput", "setWeight", "setConnectionProb")
+PARAM_DEBOUNCE = 0.05
+
+_pending_params = {}  # command name -> most recent message
+_param_timer = None
+
+
+def apply_param_update(d):
+    """
+    Apply one parameter-update command to the running simulation.
+
+    Args:
+        d: Decoded command message; its "cmd" is in DEBOUNCED_COMMANDS
+    """
+    cmd = d["cmd"]
+    if cmd == "speed":
+        new_speed = max(5, min(200, int(d["dt_ms"])))
+        CTRL["dt_ms"] = new_speed
+        logger.debug("✓ Simulation speed: %sms timestep", new_speed)
+    elif cmd == "setInput":
+        PARAMS["input_current"] = float(d["value"])
+        G.I_input = PARAMS["input_current"]
+        noise_level = max(0.02, 0.1 - PARAMS["input_current"]*0.05)
+        # Sample in NumPy and assign the array directly; a string
+        # expression would be re-parsed and code-generated by Brian2
+        G.I_noise = noise_level * (1.0 + 0.4 * RNG.standard_normal(len(G)))
+        logger.debug("Input current set to %s", PARAMS['input_current'])
+    elif cmd == "setWeight":
+        PARAMS["synapse_weight"] = float(d["value"])
+        apply_synapse_weight()
+        logger.debug("Synapse weight set to %s", PARAMS['synapse_weight'])
+    elif cmd == "setConnectionProb":
+        PARAMS["connection_prob"] = float(d["value"])
+        rewire_network()
+        logger.debug(
+            "Connection probability set to %s", PARAMS['connection_prob']
+        )
+
+
+def _flush_param_updates():
+    """Apply the latest pending value of every debounced command."""
+    global _param_timer
+    _param_timer = None
+    pending = list(_pending_params.values())
+    _pending_params.clear()
+    for d in pending:
+        try:
+            apply_param_update(d)
         except Exception as e:
-            print(f"Brain loop error: {e}")
-            time.sleep(0.01)
+            logger.error("Command error: %s", e)
 
 
-threading.Thread(target=brain_loop, daemon=True).start()
+def schedule_param_update(d):
+    """
+    Queue a parameter update, replacing any pending one of the same kind.
+
+    The debounce timer restarts on every call, so a burst of slider events
+    is applied once, with the last value of each command.
+
+    Args:
+        d: Decoded command message; its "cmd" is in DEBOUNCED_COMMANDS
+    """
+    global _param_timer
+    _pending_params[d["cmd"]] = d
+    if _param_timer is not None:
+        _param_timer.cancel()
+    _param_timer = asyncio.get_running_loop().call_later(
+        PARAM_DEBOUNCE, _flush_param_updates
+    )
+
 
 clients = set()
+# Clients that joined after the last keyframe; tx() holds back voltDelta
+# frames from them until they have received a full "volt" frame
+keyframe_waiters = set()
+keyframe_requested = False
 
 
 async def handler(ws, path):
@@ -387,112 +719,85 @@ async def handler(ws, path):
         ws: WebSocket connection
         path: WebSocket path (unused)
     """
+    global keyframe_requested
     clients.add(ws)
-    print("Client connected:", ws.remote_address)
+    keyframe_waiters.add(ws)
+    keyframe_requested = True
+    logger.info("Client connected: %s", ws.remote_address)
 
     async def rx():
         """Receive and process commands from client."""
         async for m in ws:
             try:
                 d = json.loads(m)
-                print(f"Received command: {d}")
+                logger.debug("Received command: %s", d)
 
                 if d.get("cmd") == "pause":
                     CTRL["paused"] = True
-                    print("✓ Simulation PAUSED")
+                    logger.debug("✓ Simulation PAUSED")
                 elif d.get("cmd") == "play":
                     CTRL["paused"] = False
-                    print("✓ Simulation RESUMED")
-                elif d.get("cmd") == "speed":
-                    new_speed = max(5, min(200, int(d["dt_ms"])))
-                    CTRL["dt_ms"] = new_speed
-                    print(f"✓ Simulation speed: {new_speed}ms timestep")
-                elif d.get("cmd") == "setInput":
-                    PARAMS["input_current"] = float(d["value"])
-                    G.I_input = PARAMS["input_current"]
-                    noise_level = max(
-                        0.02, 0.1 - PARAMS["input_current"]*0.05
-                    )
-                    G.I_noise = (
-                        f'{noise_level} + {noise_level*0.4}*randn()'
-                    )
-                    print(f"Input current set to {PARAMS['input_current']}")
-                elif d.get("cmd") == "setWeight":
-                    PARAMS["synapse_weight"] = float(d["value"])
-                    recreate_network()
-                    print(
-                        f"Synapse weight set to {PARAMS['synapse_weight']}"
-                    )
-                elif d.get("cmd") == "setConnectionProb":
-                    PARAMS["connection_prob"] = float(d["value"])
-                    recreate_network()
-                    print(
-                        f"Connection probability set to "
-                        f"{PARAMS['connection_prob']}"
-                    )
+                    logger.debug("✓ Simulation RESUMED")
+                elif d.get("cmd") in DEBOUNCED_COMMANDS:
+                    schedule_param_update(d)
                 elif d.get("cmd") == "setNetworkSize":
                     try:
                         new_num = int(d.get("value", NUM))
                         if 10 <= new_num <= 200:
-                            print(
-                                f"Changing network size: {NUM} -> {new_num}"
+                            logger.debug(
+                                "Changing network size: %s -> %s",
+                                NUM, new_num
                             )
                             globals()['NUM'] = new_num
                             recreate_network()
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "networkSizeChanged",
                                 "value": new_num
                             }))
                         else:
-                            print("setNetworkSize out of allowed range")
+                            logger.warning("setNetworkSize out of allowed range")
                     except Exception as ex:
-                        print(f"Error setting network size: {ex}")
+                        logger.error("Error setting network size: %s", ex)
                 elif d.get("cmd") == "reset":
                     recreate_network()
-                    print("Network reset with new parameters")
+                    logger.debug("Network reset with new parameters")
                 elif d.get("cmd") == "setNetworkMode":
                     mode = d.get("mode", "simple")
                     if mode in ["simple", "realistic"]:
                         NETWORK_MODE = mode
                         globals()["NETWORK_MODE"] = mode
-                        print(f"Switching to {mode} network mode...")
+                        logger.debug("Switching to %s network mode...", mode)
 
                         if mode == "realistic":
                             create_realistic_network()
-                            print(f"✓ Realistic network created:")
-                            print(f"  - {N_exc} excitatory neurons (80%)")
-                            print(f"  - {N_inh} inhibitory neurons (20%)")
-                            print(f"  - Clustered connectivity")
-                            print(f"  - 4 synapse types (E→E, E→I, I→E, I→I)")
+                            logger.debug(
+                                "✓ Realistic network created: %s excitatory, "
+                                "%s inhibitory, clustered E/I connectivity",
+                                N_exc, N_inh
+                            )
                         else:
                             recreate_network()
-                            print(f"✓ Simple network created:")
-                            print(f"  - {NUM} homogeneous neurons")
-                            print(f"  - Random connectivity")
+                            logger.debug(
+                                "✓ Simple network created: %s neurons, "
+                                "random connectivity", NUM
+                            )
 
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "networkModeChanged",
                             "mode": mode,
                             "neuronCount": get_neuron_count()
                         }))
                     else:
-                        print(f"Invalid network mode: {mode}")
+                        logger.warning("Invalid network mode: %s", mode)
                 elif d.get("cmd") == "toggleWeights":
-                    # Send simple connection data for visualization
-                    connections = []
-
-                    if hasattr(S, 'i') and len(S.i) > 0:
-                        for idx in range(len(S.i)):
-                            connections.append({
-                                "from": int(S.i[idx]),
-                                "to": int(S.j[idx]),
-                                "weight": 0.15,  # Use fixed weight for now
-                                "type": "excitatory"
-                            })
-
-                    await ws.send(json.dumps({
+                    # Send connection data for visualization as parallel
+                    # columns: connection k is from[k] -> to[k], weight[k]
+                    await ws.send(_dumps({
                         "cmd": "showConnections",
-                        "connections": connections
+                        "from": np.asarray(S.i[:], dtype=np.int32),
+                        "to": np.asarray(S.j[:], dtype=np.int32),
+                        "weight": np.ascontiguousarray(S.w[:]),
+                        "type": "excitatory"
                     }))
                 elif d.get("cmd") == "injectPattern":
                     # Inject a specific pattern for lesson 4
@@ -501,14 +806,14 @@ async def handler(ws, path):
                         if neuron_id < NUM:
                             # Bring close to threshold
                             G.v[neuron_id] = 0.8
-                    print("Pattern injected")
+                    logger.debug("Pattern injected")
                 elif d.get("cmd") == "testMemory":
                     # Test pattern recall
                     test_neurons = [0, 5]  # Partial pattern
                     for neuron_id in test_neurons:
                         if neuron_id < NUM:
                             G.v[neuron_id] = 0.9
-                    print("Memory test initiated")
+                    logger.debug("Memory test initiated")
 
                 # ===== Semantic Pointer Commands =====
                 elif d.get("cmd") == "enableSP":
@@ -518,8 +823,8 @@ async def handler(ws, path):
                         dim=PARAMS["sp_dimensionality"],
                         n_neurons_per_pool=PARAMS["sp_neurons_per_pool"]
                     )
-                    print("✓ Semantic Pointer mode enabled")
-                    await ws.send(json.dumps({
+                    logger.debug("✓ Semantic Pointer mode enabled")
+                    await ws.send(_dumps({
                         "cmd": "spEnabled",
                         "dimensionality": PARAMS["sp_dimensionality"],
                         "neurons_per_pool": PARAMS["sp_neurons_per_pool"]
@@ -527,7 +832,7 @@ async def handler(ws, path):
 
                 elif d.get("cmd") == "spAddVector":
                     if sp is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "SP mode not enabled. Call enableSP first."
                         }))
@@ -535,15 +840,15 @@ async def handler(ws, path):
                         name = d.get("name")
                         if name:
                             sp.vocab.add(name)
-                            print(f"✓ Added semantic pointer '{name}'")
-                            await ws.send(json.dumps({
+                            logger.debug("✓ Added semantic pointer '%s'", name)
+                            await ws.send(_dumps({
                                 "cmd": "spVectorAdded",
                                 "name": name
                             }))
 
                 elif d.get("cmd") == "spBind":
                     if sp is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "SP mode not enabled"
                         }))
@@ -553,20 +858,23 @@ async def handler(ws, path):
                         result_name = d.get("resultName", f"{a_name}_BIND_{b_name}")
                         try:
                             sp.vocab.bind(a_name, b_name, result_name)
-                            print(f"✓ Bound {a_name} ⊛ {b_name} = {result_name}")
-                            await ws.send(json.dumps({
+                            logger.debug(
+                                "✓ Bound %s ⊛ %s = %s",
+                                a_name, b_name, result_name
+                            )
+                            await ws.send(_dumps({
                                 "cmd": "spBindComplete",
                                 "resultName": result_name
                             }))
                         except KeyError as e:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "error",
                                 "message": str(e)
                             }))
 
                 elif d.get("cmd") == "spUnbind":
                     if sp is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "SP mode not enabled"
                         }))
@@ -576,20 +884,23 @@ async def handler(ws, path):
                         result_name = d.get("resultName", f"{bound_name}_UNBIND_{key_name}")
                         try:
                             sp.vocab.unbind(bound_name, key_name, result_name)
-                            print(f"✓ Unbound {bound_name} ⊛ {key_name}' = {result_name}")
-                            await ws.send(json.dumps({
+                            logger.debug(
+                                "✓ Unbound %s ⊛ %s' = %s",
+                                bound_name, key_name, result_name
+                            )
+                            await ws.send(_dumps({
                                 "cmd": "spUnbindComplete",
                                 "resultName": result_name
                             }))
                         except KeyError as e:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "error",
                                 "message": str(e)
                             }))
 
                 elif d.get("cmd") == "spSimilarity":
                     if sp is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "SP mode not enabled"
                         }))
@@ -598,28 +909,31 @@ async def handler(ws, path):
                         b_name = d.get("vectorB")
                         try:
                             similarity = sp.vocab.similarity(a_name, b_name)
-                            print(f"✓ Similarity({a_name}, {b_name}) = {similarity:.3f}")
-                            await ws.send(json.dumps({
+                            logger.debug(
+                                "✓ Similarity(%s, %s) = %.3f",
+                                a_name, b_name, similarity
+                            )
+                            await ws.send(_dumps({
                                 "cmd": "spSimilarity",
                                 "vectorA": a_name,
                                 "vectorB": b_name,
                                 "similarity": float(similarity)
                             }))
                         except KeyError as e:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "error",
                                 "message": str(e)
                             }))
 
                 elif d.get("cmd") == "spListVectors":
                     if sp is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "SP mode not enabled"
                         }))
                     else:
                         vector_names = list(sp.vocab.vectors.keys())
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "spVectorList",
                             "vectors": vector_names,
                             "count": len(vector_names)
@@ -627,7 +941,7 @@ async def handler(ws, path):
 
                 elif d.get("cmd") == "spAddNoise":
                     if sp is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "SP mode not enabled"
                         }))
@@ -636,21 +950,30 @@ async def handler(ws, path):
                         noise_level = d.get("noiseLevel", 0.5)
                         result_name = d.get("resultName", f"{vector_name}_noisy")
                         try:
-                            # Get vector and add noise
+                            # Get vector and add noise, all in one buffer
+                            # in the vocabulary dtype
                             vec = sp.vocab.get(vector_name)
-                            noise = np.random.randn(len(vec)) * noise_level
-                            noisy_vec = vec + noise
-                            noisy_vec = noisy_vec / np.linalg.norm(noisy_vec)
+                            noisy_vec = np.empty_like(vec)
+                            RNG.standard_normal(
+                                dtype=noisy_vec.dtype, out=noisy_vec
+                            )
+                            noisy_vec *= noise_level
+                            noisy_vec += vec
+                            noisy_vec /= np.linalg.norm(noisy_vec)
 
                             # Store noisy vector
                             sp.vocab.add(result_name, noisy_vec)
+                            sp.derived_names.add(result_name)
 
                             # Calculate similarity degradation
                             original_sim = 1.0  # cosine_similarity(vec, vec)
                             noisy_sim = cosine_similarity(vec, noisy_vec)
 
-                            print(f"✓ Added noise to {vector_name} → {result_name} (similarity: {noisy_sim:.2%})")
-                            await ws.send(json.dumps({
+                            logger.debug(
+                                "✓ Added noise to %s → %s (similarity: %.2f%%)",
+                                vector_name, result_name, 100 * noisy_sim
+                            )
+                            await ws.send(_dumps({
                                 "cmd": "spAddNoise",
                                 "result": {
                                     "noisyVector": result_name,
@@ -660,14 +983,14 @@ async def handler(ws, path):
                                 }
                             }))
                         except KeyError as e:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "error",
                                 "message": str(e)
                             }))
 
                 elif d.get("cmd") == "spCleanup":
                     if sp is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "SP mode not enabled"
                         }))
@@ -681,13 +1004,13 @@ async def handler(ws, path):
                             if noisy_name not in sp.vocab:
                                 raise KeyError(f"Vector '{noisy_name}' not found")
 
-                            # Initialize cleanup if not already done
-                            if sp.cleanup_memory is None:
-                                sp.initialize_cleanup()
+                            # (Re)build attractors only when the concepts
+                            # changed since the cleanup memory was created
+                            cleanup_memory = sp.ensure_cleanup()
 
                             # Get noisy vector and clean it
                             noisy_vec = sp.vocab.get(noisy_name)
-                            cleaned_vec, trajectory, n_iters = sp.cleanup_memory.cleanup(
+                            cleaned_vec, trajectory, n_iters = cleanup_memory.cleanup(
                                 noisy_vec,
                                 max_iterations=max_iterations,
                                 return_trajectory=True
@@ -695,12 +1018,18 @@ async def handler(ws, path):
 
                             # Store result in vocabulary
                             sp.vocab.add(result_name, cleaned_vec)
+                            sp.derived_names.add(result_name)
 
                             # Find nearest match
-                            nearest_name, similarity = sp.cleanup_memory.find_nearest_match(cleaned_vec)
+                            nearest_name, similarity = cleanup_memory.find_nearest_match(cleaned_vec)
 
-                            print(f"✓ Cleaned {noisy_name} → {result_name} (nearest: {nearest_name}, similarity: {similarity:.2%}, {n_iters} iterations)")
-                            await ws.send(json.dumps({
+                            logger.debug(
+                                "✓ Cleaned %s → %s (nearest: %s, "
+                                "similarity: %.2f%%, %s iterations)",
+                                noisy_name, result_name, nearest_name,
+                                100 * similarity, n_iters
+                            )
+                            await ws.send(_dumps({
                                 "cmd": "spCleanup",
                                 "result": {
                                     "cleanedVector": result_name,
@@ -711,7 +1040,7 @@ async def handler(ws, path):
                                 }
                             }))
                         except (KeyError, ValueError) as e:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "error",
                                 "message": str(e)
                             }))
@@ -720,28 +1049,27 @@ async def handler(ws, path):
                 elif d.get("cmd") == "enableBG":
                     PARAMS["bg_enabled"] = True
                     global bg
-                    import os
                     template_path = os.path.join(
                         os.path.dirname(__file__),
                         "data", "brain_region_maps", "basal_ganglia_action_selection.json"
                     )
                     try:
                         bg = BasalGangliaActionSelection(template_path)
-                        print("✓ Basal Ganglia mode enabled")
-                        await ws.send(json.dumps({
+                        logger.debug("✓ Basal Ganglia mode enabled")
+                        await ws.send(_dumps({
                             "cmd": "bgEnabled",
                             "message": "Basal ganglia action selection initialized"
                         }))
                     except Exception as e:
-                        print(f"Error initializing basal ganglia: {e}")
-                        await ws.send(json.dumps({
+                        logger.error("Error initializing basal ganglia: %s", e)
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": f"Failed to initialize basal ganglia: {str(e)}"
                         }))
 
                 elif d.get("cmd") == "bgRegisterAction":
                     if bg is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "BG mode not enabled. Call enableBG first."
                         }))
@@ -760,7 +1088,7 @@ async def handler(ws, path):
                             d2_indices = list(range(d2_start, d2_start + n_d2))
                             
                             bg.register_action(action_name, d1_indices, d2_indices)
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "bgActionRegistered",
                                 "actionName": action_name,
                                 "nActions": len(bg.action_pools)
@@ -768,7 +1096,7 @@ async def handler(ws, path):
 
                 elif d.get("cmd") == "bgSetUtility":
                     if bg is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "BG mode not enabled"
                         }))
@@ -778,27 +1106,30 @@ async def handler(ws, path):
                         
                         try:
                             bg.set_action_utility(action_name, utility)
-                            print(f"✓ Set utility for '{action_name}' = {utility:.2f}")
-                            await ws.send(json.dumps({
+                            logger.debug(
+                                "✓ Set utility for '%s' = %.2f",
+                                action_name, utility
+                            )
+                            await ws.send(_dumps({
                                 "cmd": "bgUtilitySet",
                                 "actionName": action_name,
                                 "utility": utility
                             }))
                         except KeyError as e:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "error",
                                 "message": str(e)
                             }))
 
                 elif d.get("cmd") == "bgGetSelected":
                     if bg is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "BG mode not enabled"
                         }))
                     else:
                         selected_action, confidence = bg.get_selected_action()
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "bgSelectedAction",
                             "action": selected_action,
                             "confidence": float(confidence) if selected_action else 0.0
@@ -806,7 +1137,7 @@ async def handler(ws, path):
 
                 elif d.get("cmd") == "bgRun":
                     if bg is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "BG mode not enabled"
                         }))
@@ -816,69 +1147,80 @@ async def handler(ws, path):
                             from brian2 import ms as brian_ms
                             bg.network.run(duration_ms * brian_ms)
                             selected, conf = bg.get_selected_action()
-                            print(f"✓ BG ran for {duration_ms}ms, selected: {selected} (conf: {conf:.2f})")
-                            await ws.send(json.dumps({
+                            logger.debug(
+                                "✓ BG ran for %sms, selected: %s (conf: %.2f)",
+                                duration_ms, selected, conf
+                            )
+                            await ws.send(_dumps({
                                 "cmd": "bgRunComplete",
                                 "durationMs": duration_ms,
                                 "selectedAction": selected,
                                 "confidence": float(conf) if selected else 0.0
                             }))
                         except Exception as e:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "cmd": "error",
                                 "message": f"Error running BG network: {str(e)}"
                             }))
 
                 elif d.get("cmd") == "bgReset":
                     if bg is None:
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "error",
                             "message": "BG mode not enabled"
                         }))
                     else:
                         bg.reset()
-                        await ws.send(json.dumps({
+                        await ws.send(_dumps({
                             "cmd": "bgReset",
                             "message": "Basal ganglia state reset"
                         }))
 
             except Exception as e:
-                print(f"Command error: {e}")
+                logger.error("Command error: %s", e)
 
     async def tx():
         """Transmit simulation data to all connected clients."""
-        loop = asyncio.get_event_loop()
         while True:
             try:
-                item = await loop.run_in_executor(None, q.get)
-                if clients:
-                    alive_clients = [
-                        c for c in list(clients) if not c.closed
-                    ]
-                    if alive_clients:
-                        await asyncio.gather(
-                            *[c.send(json.dumps(item))
-                              for c in alive_clients],
-                            return_exceptions=True
-                        )
+                # Already encoded by publish()
+                is_key, data = await q.get()
+                if is_key:
+                    targets = list(clients)
+                    keyframe_waiters.difference_update(targets)
+                else:
+                    targets = [c for c in clients if c not in keyframe_waiters]
+                if targets:
+                    # Closed sockets fail inside gather and are pruned
+                    # from clients when their handler exits
+                    await asyncio.gather(
+                        *[c.send(data) for c in targets],
+                        return_exceptions=True
+                    )
             except Exception as e:
-                print(f"Send error: {e}")
+                logger.error("Send error: %s", e)
     
     try:
         await asyncio.gather(rx(), tx())
     except websockets.exceptions.ConnectionClosed:
-        print("Client disconnected")
+        logger.info("Client disconnected")
     finally:
         clients.discard(ws)
+        keyframe_waiters.discard(ws)
 
 
 async def main():
     """Start the WebSocket server and run indefinitely."""
-    print(f"Starting Brian2 SNN server...")
-    print(f"WebSocket server at ws://localhost:{PORT}")
+    global q
+    q = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+
+    logger.info("Starting Brian2 SNN server...")
+    logger.info("WebSocket server at ws://localhost:%s", PORT)
     state = 'paused' if CTRL['paused'] else 'running'
-    print(f"Neurons: {NUM}, Initial state: {state}")
+    logger.info("Neurons: %s, Initial state: %s", NUM, state)
 
+    # Keep a reference so the simulation task is not garbage collected
+    sim_task = asyncio.create_task(brain_loop())
     async with websockets.serve(handler, "localhost", PORT):
         await asyncio.Future()
 
@@ -900,14 +1242,14 @@ def create_realistic_network():
     Updates global network objects:
     - G_exc, G_inh: Neuron groups (excitatory and inhibitory)
     - S_ee, S_ei, S_ie, S_ii: Synapse groups (E→E, E→I, I→E, I→I)
-    - P, sm, vm, net: Poisson input, monitors, and network
+    - sm, vm, net: Monitors and network
 
     Reference:
         Based on neuroscience research showing cortical circuits have
         ~80% excitatory and ~20% inhibitory neurons (Beaulieu &
         Colonnier 1985; Ramaswamy et al. 2021).
     """
-    global G_exc, G_inh, S_ee, S_ei, S_ie, S_ii, P, sm, vm, net, N_exc, N_inh
+    global G_exc, G_inh, S_ee, S_ei, S_ie, S_ii, sm, vm, net, N_exc, N_inh
 
     start_scope()
 
@@ -918,10 +1260,15 @@ def create_realistic_network():
     tau = PARAMS["tau"] * ms
     tau_ref = PARAMS["refractory_period"] * ms
 
-    # Leaky integrate-and-fire with realistic parameters
+    # Leaky integrate-and-fire with realistic parameters. Background
+    # Poisson drive onto I_input is folded into the equations as its
+    # diffusion approximation (drift bg_mu, noise bg_sigma) rather than
+    # a separate PoissonInput object stepped every timestep
     eqs = """
     dv/dt = (-v + I_input + I_noise + I_syn)/tau : 1
-    I_input : 1
+    dI_input/dt = bg_mu + bg_sigma * xi : 1
+    bg_mu : 1/second (constant)
+    bg_sigma : second**-0.5 (constant)
     I_noise : 1
     I_syn : 1
     cluster : 1  # Which cluster this neuron belongs to
@@ -945,12 +1292,13 @@ def create_realistic_network():
         method='euler'
     )
     
-    # Assign clusters (4 clusters for excitatory neurons)
-    for i in range(N_exc):
-        G_exc.cluster[i] = i // (N_exc // 4)  # 4 clusters
-
-    for i in range(N_inh):
-        G_inh.cluster[i] = 4  # Inhibitory cluster
+    # Assign clusters (4 clusters for excitatory neurons); leftover neurons
+    # when N_exc is not a multiple of 4 join the last excitatory cluster
+    # The id arrays are kept for connect_clustered below
+    exc_clusters = np.minimum(np.arange(N_exc) // max(1, N_exc // 4), 3)
+    inh_clusters = np.full(N_inh, 4)  # Inhibitory cluster
+    G_exc.cluster = exc_clusters
+    G_inh.cluster = inh_clusters
 
     # Initialize with realistic resting potentials
     G_exc.v = 'rand() * 0.1'
@@ -991,41 +1339,39 @@ def create_realistic_network():
     
     # Create clustered connectivity
     def connect_clustered(
-        synapses, source_group, target_group,
+        synapses, source_group, target_group, src_clusters, tgt_clusters,
         prob_local=0.4, prob_distant=0.08
     ):
         """
         Connect neurons with clustered topology.
 
         Same-cluster connections have higher probability than cross-cluster.
-        This creates modular network structure.
+        This creates modular network structure. Pairs are drawn by the
+        cluster_connect kernel (parallel Numba when available), which never
+        materializes an (n_src × n_tgt) mask, and handed to Brian2 as index
+        arrays in a single connect call. Cluster ids are passed in as the
+        arrays they were assigned from, not read back from the groups.
         """
-        import numpy as np
-        for i in range(len(source_group)):
-            for j in range(len(target_group)):
-                if i != j:  # No self-connections
-                    # Same cluster = higher probability
-                    if (hasattr(source_group, 'cluster') and
-                            hasattr(target_group, 'cluster')):
-                        same_cluster = (
-                            source_group.cluster[i] ==
-                            target_group.cluster[j]
-                        )
-                        if same_cluster:
-                            if np.random.rand() < prob_local:
-                                synapses.connect(i=i, j=j)
-                        else:
-                            if np.random.rand() < prob_distant:
-                                synapses.connect(i=i, j=j)
-                    else:
-                        if np.random.rand() < prob_distant:
-                            synapses.connect(i=i, j=j)
+        i_idx, j_idx = cluster_connect(
+            src_clusters, tgt_clusters, prob_local, prob_distant,
+            source_group is target_group,  # No self-connections
+            int(RNG.integers(2**31))
+        )
+        if len(i_idx):
+            synapses.connect(i=i_idx, j=j_idx)
+        else:
+            # Mark as connected so weights can still be assigned
+            synapses.connect(False)
     
     # Apply structured connectivity
-    connect_clustered(S_ee, G_exc, G_exc, prob_local=0.6, prob_distant=0.1)
-    connect_clustered(S_ei, G_exc, G_inh, prob_local=0.0, prob_distant=0.5)
-    connect_clustered(S_ie, G_inh, G_exc, prob_local=0.0, prob_distant=0.8)
-    connect_clustered(S_ii, G_inh, G_inh, prob_local=0.0, prob_distant=0.3)
+    connect_clustered(S_ee, G_exc, G_exc, exc_clusters, exc_clusters,
+                      prob_local=0.6, prob_distant=0.1)
+    connect_clustered(S_ei, G_exc, G_inh, exc_clusters, inh_clusters,
+                      prob_local=0.0, prob_distant=0.5)
+    connect_clustered(S_ie, G_inh, G_exc, inh_clusters, exc_clusters,
+                      prob_local=0.0, prob_distant=0.8)
+    connect_clustered(S_ii, G_inh, G_inh, inh_clusters, inh_clusters,
+                      prob_local=0.0, prob_distant=0.3)
     
     # Set synaptic weights
     S_ee.w = PARAMS["synapse_weight"]
@@ -1034,13 +1380,15 @@ def create_realistic_network():
     S_ii.w = PARAMS["inhibition_strength"] * 0.8
     
     # SPARSE EXTERNAL INPUT - stimulate one cluster at a time
-    cluster_to_stimulate = np.random.randint(0, 4)
-    for i in range(N_exc):
-        if G_exc.cluster[i] == cluster_to_stimulate:
-            G_exc.I_input[i] = PARAMS["input_current"] * 2
+    cluster_to_stimulate = RNG.integers(0, 4)
+    G_exc.I_input[exc_clusters == cluster_to_stimulate] = (
+        PARAMS["input_current"] * 2
+    )
     
-    # Poisson input
-    P = PoissonInput(G_exc, 'I_input', N_exc, 1*Hz, weight=0.01)
+    # Background input: N_exc sources at 1 Hz, weight 0.01, excitatory only
+    bg_rate = N_exc * 1*Hz
+    G_exc.bg_mu = 0.01 * bg_rate
+    G_exc.bg_sigma = 0.01 * np.sqrt(bg_rate)
     
     # Monitors
     sm = SpikeMonitor(G_exc + G_inh)
@@ -1052,4 +1400,8 @@ def create_realistic_network():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG if DEBUG else logging.INFO,
+        format="%(message)s"
+    )
     asyncio.run(main())
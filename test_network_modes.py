@@ -10,6 +10,33 @@ import json
 import sys
 import websockets
 
+# Optional: orjson decodes frames in C
+try:
+    from orjson import loads
+except ImportError:
+    loads = json.loads
+
+
+async def drain(ws, n, timeout):
+    """
+    Receive and decode the next n messages under one shared timeout.
+
+    websockets allows only one pending recv() per connection, so the
+    messages are read back to back rather than gathered concurrently.
+
+    Args:
+        ws: Open WebSocket connection
+        n: Number of messages to read
+        timeout: Seconds allowed for all n messages together
+
+    Returns:
+        List of decoded messages
+    """
+    async def _recv_all():
+        return [loads(await ws.recv()) for _ in range(n)]
+
+    return await asyncio.wait_for(_recv_all(), timeout=timeout)
+
 
 async def test_network_mode(mode="simple"):
     """Test switching between network modes via WebSocket."""
@@ -31,14 +58,13 @@ async def test_network_mode(mode="simple"):
             }))
 
             # Wait for response
-            response = await asyncio.wait_for(ws.recv(), timeout=5.0)
-            data = json.loads(response)
+            data, = await drain(ws, 1, timeout=5.0)
 
             if "cmd" in data and data["cmd"] == "networkModeChanged":
                 print(f"   ✓ Mode changed to: {data.get('mode')}")
                 print(f"   ✓ Neuron count: {data.get('neuronCount')}")
             else:
-                print(f"   Received data: {response[:200]}")
+                print(f"   Received data: {str(data)[:200]}")
 
             # Test 2: Resume simulation
             print("\n2. Resuming simulation...")
@@ -49,17 +75,18 @@ async def test_network_mode(mode="simple"):
             spike_count = 0
             data_points = 0
 
-            for _ in range(10):  # Collect 10 data frames
-                msg = await asyncio.wait_for(ws.recv(), timeout=2.0)
-                data = json.loads(msg)
-
+            for data in await drain(ws, 10, timeout=20.0):  # 10 data frames
                 if "spikes" in data:
-                    spike_count += len(data["spikes"])
+                    spike_count += len(data["spikes"]["i"])
                     data_points += 1
+                    if "volt" in data:
+                        volt_info = f"neurons={len(data['volt'])}"
+                    else:
+                        volt_info = f"changed={len(data['voltDelta']['i'])}"
                     print(f"   Frame {data_points}: "
                           f"t={data.get('t', 0):.1f}ms, "
-                          f"spikes={len(data['spikes'])}, "
-                          f"neurons={len(data.get('volt', {}))}")
+                          f"spikes={len(data['spikes']['i'])}, "
+                          f"{volt_info}")
 
             print(f"\n✓ Collected {data_points} frames")
             print(f"✓ Total spikes: {spike_count}")
@@ -17,8 +17,12 @@ License: MIT
 import pytest
 import numpy as np
 import asyncio
+import os
 from typing import Dict, List, Any
 
+from scripts._kernels import poisson_spike_pattern
+from scripts.basal_ganglia import BrainRegionTemplate
+
 
 # ============================================================================
 # Brian2 Mock Fixtures
@@ -212,6 +216,38 @@ def sample_brain_region():
     }
 
 
+# ============================================================================
+# Brain Region Template Fixtures
+# ============================================================================
+
+@pytest.fixture(scope="session")
+def template_path():
+    """
+    Path to the basal ganglia action selection template.
+
+    Returns:
+        str: Template JSON path
+    """
+    return os.path.join(
+        os.path.dirname(__file__), '..',
+        'data', 'brain_region_maps', 'basal_ganglia_action_selection.json'
+    )
+
+
+@pytest.fixture(scope="session")
+def loaded_template(template_path):
+    """
+    Basal ganglia template, loaded once per test session.
+
+    Shared between tests, so treat it as read-only: tests that build a
+    network from it should work on a copy.deepcopy of the template.
+
+    Returns:
+        BrainRegionTemplate: Template that has not built a network yet
+    """
+    return BrainRegionTemplate(template_path)
+
+
 # ============================================================================
 # Utility Fixtures
 # ============================================================================
@@ -241,14 +277,9 @@ def spike_pattern_generator():
         Returns:
             List of (neuron_id, time) tuples
         """
-        spikes = []
-        for neuron_id in range(num_neurons):
-            # Poisson process for spike times
-            num_spikes = np.random.poisson(rate * duration)
-            spike_times = np.sort(np.random.uniform(0, duration, num_spikes))
-            for t in spike_times:
-                spikes.append((neuron_id, t))
-        return sorted(spikes, key=lambda x: x[1])
+        seed = int(np.random.randint(2**31 - 1))
+        neuron_ids, times = poisson_spike_pattern(num_neurons, duration, rate, seed)
+        return list(zip(neuron_ids.tolist(), times.tolist()))
 
     return _generate_pattern
 
@@ -0,0 +1,77 @@
+"""
+Integration tests for the WebSocket frame stream.
+
+Runs server.main() in-process on a free port and talks to it with the
+websockets client.
+"""
+import asyncio
+import json
+import os
+import socket
+import sys
+
+import pytest
+import websockets
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import server
+
+
+def _free_port():
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+async def _next_voltage_frame(ws, timeout=10.0):
+    """Receive until a frame carrying voltages ("volt" or "voltDelta")."""
+    while True:
+        msg = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+        if "volt" in msg or "voltDelta" in msg:
+            return msg
+
+
+async def _connect(uri, attempts=50):
+    """Connect once the server is listening."""
+    for _ in range(attempts):
+        try:
+            return await websockets.connect(uri)
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise ConnectionError(f"Server did not start at {uri}")
+
+
+class TestVoltageStream:
+    """Tests for voltage keyframes and deltas."""
+
+    @pytest.mark.integration
+    @pytest.mark.network
+    def test_late_client_starts_with_keyframe(self, monkeypatch):
+        """Test that a client joining mid-stream first receives a full keyframe."""
+        port = _free_port()
+        monkeypatch.setattr(server, "PORT", port)
+        monkeypatch.setitem(server.CTRL, "paused", False)
+        uri = f"ws://localhost:{port}"
+
+        async def scenario():
+            main_task = asyncio.create_task(server.main())
+            try:
+                first = await _connect(uri)
+                try:
+                    # Wait until the stream is between keyframes
+                    while "voltDelta" not in await _next_voltage_frame(first):
+                        pass
+                    async with websockets.connect(uri) as second:
+                        return await _next_voltage_frame(second)
+                finally:
+                    await first.close()
+            finally:
+                main_task.cancel()
+
+        frame = asyncio.run(scenario())
+
+        assert "volt" in frame, "Late client must not start with a voltDelta"
+        assert len(frame["volt"]) == len(server.get_voltage_monitor().v)
@@ -4,6 +4,8 @@ Unit tests for Basal Ganglia Action Selection.
 Tests template loading, action registration, utility setting, and winner-take-all
 action selection dynamics.
 """
+import copy
+import logging
 import pytest
 import numpy as np
 import os
@@ -12,27 +14,39 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from scripts.basal_ganglia import BrainRegionTemplate, BasalGangliaActionSelection
+from scripts.basal_ganglia import BrainRegionTemplate, BasalGangliaActionSelection, load_template
 
 
 class TestBrainRegionTemplate:
     """Tests for template loading and network building."""
     
-    @pytest.fixture
-    def template_path(self):
-        """Path to basal ganglia template."""
-        return os.path.join(
-            os.path.dirname(__file__), '..', '..',
-            'data', 'brain_region_maps', 'basal_ganglia_action_selection.json'
-        )
-    
-    def test_template_loads(self, template_path):
+    def test_template_loads(self, loaded_template):
         """Test that template JSON loads successfully."""
-        template = BrainRegionTemplate(template_path)
+        template = loaded_template
         assert template.region_name == "Basal Ganglia Action Selection Circuit"
         assert "clusters" in template.template_data
         assert "connections" in template.template_data
     
+    def test_template_cached(self, template_path, tmp_path):
+        """Test that templates are parsed once and reloaded when changed."""
+        first = BrainRegionTemplate(template_path)
+        second = BrainRegionTemplate(template_path)
+        assert first.template_data is second.template_data
+        
+        path = tmp_path / "region.json"
+        path.write_text('{"regionName": "A"}')
+        assert load_template(str(path))["regionName"] == "A"
+        path.write_text('{"regionName": "B"}')
+        os.utime(path, (0, 12345))
+        assert load_template(str(path))["regionName"] == "B"
+    
+    def test_build_standalone_requires_flag(self, loaded_template):
+        """Test that runtime templates refuse a standalone build."""
+        template = loaded_template
+        assert template.standalone is False
+        with pytest.raises(RuntimeError):
+            template.build_standalone()
+    
     def test_neuron_presets_exist(self):
         """Test that all required neuron presets are defined."""
         required_presets = ["medium_spiny", "pyramidal", "pallidal", "thalamic_relay"]
@@ -41,16 +55,25 @@ class TestBrainRegionTemplate:
             assert "eqs" in BrainRegionTemplate.NEURON_PRESETS[preset]
             assert "threshold" in BrainRegionTemplate.NEURON_PRESETS[preset]
     
-    def test_network_builds(self, template_path):
+    def test_network_builds(self, loaded_template):
         """Test that Brian2 network builds without errors."""
-        template = BrainRegionTemplate(template_path)
+        template = copy.deepcopy(loaded_template)
         network = template.build_network()
         assert network is not None
         assert len(template.clusters) > 0
     
-    def test_cluster_creation(self, template_path):
+    def test_verbose_logging(self, template_path, caplog):
+        """Test that progress is logged at INFO only when verbose."""
+        with caplog.at_level(logging.INFO, logger="scripts.basal_ganglia"):
+            BrainRegionTemplate(template_path).build_network()
+            assert "Built network" not in caplog.text
+            
+            BrainRegionTemplate(template_path, verbose=True).build_network()
+            assert "Built network" in caplog.text
+    
+    def test_cluster_creation(self, loaded_template):
         """Test that all clusters are created."""
-        template = BrainRegionTemplate(template_path)
+        template = copy.deepcopy(loaded_template)
         template.build_network()
         
         expected_clusters = [
@@ -64,14 +87,6 @@ class TestBrainRegionTemplate:
 class TestBasalGangliaActionSelection:
     """Tests for action selection mechanism."""
     
-    @pytest.fixture
-    def template_path(self):
-        """Path to basal ganglia template."""
-        return os.path.join(
-            os.path.dirname(__file__), '..', '..',
-            'data', 'brain_region_maps', 'basal_ganglia_action_selection.json'
-        )
-    
     @pytest.fixture
     def bg_system(self, template_path):
         """Create basal ganglia action selection system."""
@@ -144,18 +159,42 @@ class TestBasalGangliaActionSelection:
         bg_system.reset()
         assert np.all(bg_system.striatum_d1.I_input == 0.0)
         assert np.all(bg_system.striatum_d2.I_input == 0.0)
+    
+    def test_reset_restores_snapshot(self, bg_system):
+        """Test that reset restores baseline inputs and redraws voltages."""
+        from brian2 import StateMonitor, ms
+        
+        bg_system.register_action("REACH", [0, 1, 2], [0, 1, 2])
+        bg_system.schedule_action_utilities({"REACH": [1.0]}, interval=5 * ms)
+        bg_system.network.add(StateMonitor(bg_system.thalamus, 'v', record=0))
+        bg_system.network.run(5 * ms)
+        
+        bg_system.reset()
+        first_v = np.array(bg_system.thalamus.v)
+        assert np.all((first_v >= 0.0) & (first_v < 0.3))
+        assert np.all(bg_system.striatum_d1.I_input == 0.0)
+        assert np.all(bg_system.gpi.I_input == 0.1)
+        bg_system.network.run(5 * ms)  # Still runnable without the schedule
+        
+        bg_system.reset()
+        assert not np.allclose(bg_system.thalamus.v, first_v), \
+            "Each reset starts a trial from fresh random voltages"
+    
+    def test_construction_leaves_gpi_input(self, template_path):
+        """Test that construction does not apply the tonic GPi input."""
+        bg = BasalGangliaActionSelection(template_path)
+        assert np.all(bg.gpi.I_input == 0.0)
+        
+        bg.reset()
+        assert np.all(bg.gpi.I_input == 0.1)
 
 
 class TestActionCompetition:
     """Tests for competitive action selection dynamics."""
     
     @pytest.fixture
-    def bg_multi(self):
+    def bg_multi(self, template_path):
         """Create BG system with multiple registered actions."""
-        template_path = os.path.join(
-            os.path.dirname(__file__), '..', '..',
-            'data', 'brain_region_maps', 'basal_ganglia_action_selection.json'
-        )
         bg = BasalGangliaActionSelection(template_path)
         
         # Register 3 actions with non-overlapping neurons
@@ -188,6 +227,57 @@ class TestActionCompetition:
         
         # High utility should produce higher D1 input
         assert d1_input_a > d1_input_b
+    
+    def test_scheduled_utilities(self, bg_multi):
+        """Test that scheduled utilities switch striatal input during one run."""
+        from brian2 import ms
+        
+        bg_multi.schedule_action_utilities(
+            {"ACTION_A": [0.9, 0.1], "ACTION_B": [0.1, 0.9]},
+            interval=5 * ms
+        )
+        
+        bg_multi.network.run(5 * ms)
+        assert bg_multi.striatum_d1.I_input[0] > bg_multi.striatum_d1.I_input[30]
+        
+        bg_multi.network.run(5 * ms)
+        assert bg_multi.striatum_d1.I_input[0] < bg_multi.striatum_d1.I_input[30]
+        assert bg_multi.striatum_d2.I_input[0] > bg_multi.striatum_d2.I_input[30]
+    
+    def test_schedule_after_prior_run(self, bg_multi):
+        """Test that a schedule installed later starts from its first entry."""
+        from brian2 import ms
+        
+        bg_multi.network.run(20 * ms)
+        bg_multi.reset()
+        bg_multi.schedule_action_utilities(
+            {"ACTION_A": [0.9, 0.1], "ACTION_B": [0.1, 0.9]},
+            interval=5 * ms
+        )
+        
+        bg_multi.network.run(5 * ms)
+        assert bg_multi.striatum_d1.I_input[0] == pytest.approx(0.9 * bg_multi.D1_GAIN)
+        assert bg_multi.striatum_d1.I_input[30] == pytest.approx(0.1 * bg_multi.D1_GAIN)
+        
+        bg_multi.network.run(5 * ms)
+        assert bg_multi.striatum_d1.I_input[0] == pytest.approx(0.1 * bg_multi.D1_GAIN)
+    
+    def test_schedule_validation(self, bg_multi):
+        """Test that malformed schedules are rejected."""
+        with pytest.raises(KeyError):
+            bg_multi.schedule_action_utilities({"INVALID": [0.5]})
+        with pytest.raises(ValueError):
+            bg_multi.schedule_action_utilities({"ACTION_A": [0.5], "ACTION_B": [0.5, 0.5]})
+    
+    def test_selection_from_recorded_activity(self, bg_multi):
+        """Test selecting an action from a given thalamic activity vector."""
+        thal_activity = np.zeros(len(bg_multi.thalamus))
+        thal_activity[40:60] = 0.8  # Inside ACTION_B's third of the thalamus
+        
+        selected, confidence = bg_multi.get_selected_action(thal_activity=thal_activity)
+        
+        assert selected == "ACTION_B"
+        assert confidence > 0
 
 
 if __name__ == "__main__":
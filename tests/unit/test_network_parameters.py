@@ -16,6 +16,11 @@ validation logic into testable functions.
 import pytest
 import numpy as np
 
+from scripts._kernels import (
+    cluster_connect, cluster_connect_blocks, cluster_index_table,
+    poisson_spike_pattern
+)
+
 
 # ============================================================================
 # Network Size Validation Tests
@@ -374,3 +379,99 @@ class TestHelperFunctions:
         # Invalid JSON should raise JSONDecodeError
         with pytest.raises(json.JSONDecodeError):
             json.loads(invalid_json)
+
+
+# ============================================================================
+# Clustered Connectivity Tests
+# ============================================================================
+
+@pytest.mark.parametrize("connect", [cluster_connect, cluster_connect_blocks])
+class TestClusterConnect:
+    """Test suite for the clustered connectivity kernels."""
+
+    @pytest.mark.unit
+    def test_connection_probabilities(self, connect):
+        """Test that local and distant pairs connect at their probabilities."""
+        clusters = np.repeat(np.arange(4.0), 100)
+        i, j = connect(clusters, clusters, 0.6, 0.1, True, 7)
+
+        assert i.dtype == np.int32 and j.dtype == np.int32
+        assert not np.any(i == j), "Self-connections must be skipped"
+
+        same = clusters[i] == clusters[j]
+        n_local = 4 * 100 * 99
+        n_distant = 400 * 300
+        assert same.sum() / n_local == pytest.approx(0.6, abs=0.02)
+        assert (~same).sum() / n_distant == pytest.approx(0.1, abs=0.01)
+
+    @pytest.mark.unit
+    def test_deterministic_per_seed(self, connect):
+        """Test that equal seeds reproduce the same synapses."""
+        src = np.repeat(np.arange(4.0), 10)
+        tgt = np.full(10, 4.0)
+
+        first = connect(src, tgt, 0.0, 0.5, False, 3)
+        second = connect(src, tgt, 0.0, 0.5, False, 3)
+
+        np.testing.assert_array_equal(first[0], second[0])
+        np.testing.assert_array_equal(first[1], second[1])
+        assert np.all(np.diff(first[0]) >= 0), "Pairs are sorted by source"
+
+    @pytest.mark.unit
+    def test_zero_probability(self, connect):
+        """Test that a zero probability yields no synapses."""
+        clusters = np.full(10, 4.0)
+        i, j = connect(clusters, clusters, 0.0, 0.3, True, 1)
+
+        assert len(i) == 0 and len(j) == 0
+
+
+class TestClusterIndexTable:
+    """Test suite for grouping neuron indices by cluster."""
+
+    @pytest.mark.unit
+    def test_groups_indices_by_cluster(self):
+        """Test that every neuron appears once, under its own cluster id."""
+        clusters = np.array([2.0, 0.0, 2.0, 1.0, 0.0])
+        table = cluster_index_table(clusters)
+
+        assert [c for c, _ in table] == [0.0, 1.0, 2.0]
+        np.testing.assert_array_equal(table[0][1], [1, 4])
+        np.testing.assert_array_equal(table[1][1], [3])
+        np.testing.assert_array_equal(table[2][1], [0, 2])
+        assert cluster_index_table(np.empty(0)) == []
+
+
+# ============================================================================
+# Spike Pattern Tests
+# ============================================================================
+
+class TestPoissonSpikePattern:
+    """Test suite for the Poisson spike pattern kernel."""
+
+    @pytest.mark.unit
+    def test_rate_and_ordering(self):
+        """Test that patterns fire at the requested rate, ordered by time."""
+        ids, times = poisson_spike_pattern(500, 2.0, 10.0, 5)
+
+        assert len(ids) / (500 * 2.0) == pytest.approx(10.0, rel=0.05)
+        assert np.all(np.diff(times) >= 0), "Spikes are sorted by time"
+        assert np.all((times >= 0.0) & (times < 2.0))
+        assert ids.min() >= 0 and ids.max() < 500
+
+    @pytest.mark.unit
+    def test_deterministic_per_seed(self):
+        """Test that equal seeds reproduce the same pattern."""
+        first = poisson_spike_pattern(50, 1.0, 20.0, 9)
+        second = poisson_spike_pattern(50, 1.0, 20.0, 9)
+
+        np.testing.assert_array_equal(first[0], second[0])
+        np.testing.assert_array_equal(first[1], second[1])
+
+    @pytest.mark.unit
+    def test_fixture_returns_tuples(self, spike_pattern_generator):
+        """Test that the conftest fixture yields (neuron_id, time) tuples."""
+        pattern = spike_pattern_generator(num_neurons=50, duration=1.0)
+
+        assert all(isinstance(i, int) for i, _ in pattern)
+        assert [t for _, t in pattern] == sorted(t for _, t in pattern)
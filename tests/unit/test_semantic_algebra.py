@@ -18,12 +18,17 @@ import numpy as np
 from scripts.semantic_algebra import (
     circular_convolution,
     circular_correlation,
+    circular_convolution_batch,
+    circular_correlation_batch,
+    apply_circ_conv,
     superposition,
     cosine_similarity,
     SemanticVocabulary,
     NeuralEncoder,
     SemanticWeightGenerator,
     CleanupMemory,
+    HAVE_CUPY,
+    HAVE_JAX,
 )
 
 
@@ -142,6 +147,47 @@ class TestCircularCorrelation:
 
         assert np.abs(np.linalg.norm(result) - 1.0) < 0.01
 
+    def test_batch_matches_single(self):
+        """Test that batched binding/unbinding match the single-vector versions."""
+        a = np.random.randn(4, 50)
+        b = np.random.randn(4, 50)
+
+        bound = circular_convolution_batch(a, b)
+        unbound = circular_correlation_batch(bound, b)
+        for i in range(4):
+            assert np.allclose(bound[i], circular_convolution(a[i], b[i]))
+            assert np.allclose(unbound[i], circular_correlation(bound[i], b[i]))
+
+        # A single key broadcasts over the batch
+        assert np.allclose(circular_convolution_batch(a, b[0])[1],
+                           circular_convolution(a[1], b[0]))
+
+        with pytest.raises(ValueError, match="dimensions must match"):
+            circular_convolution_batch(a, np.random.randn(4, 40))
+
+    def test_apply_circ_conv_matches_circulant(self):
+        """Test column-wise convolution against an explicit circulant matrix."""
+        v = np.random.randn(50)
+        M = np.random.randn(50, 7)
+        circulant = np.stack([np.roll(v, j) for j in range(50)], axis=1)
+
+        assert np.allclose(apply_circ_conv(v, M), circulant @ M)
+
+        with pytest.raises(ValueError, match="dimensions must match"):
+            apply_circ_conv(v, np.random.randn(40, 7))
+
+    def test_key_spectrum_follows_key_contents(self):
+        """Test that the memoized key spectrum is keyed on values, not identity."""
+        c = np.random.randn(50)
+        a = np.random.randn(50)
+        first = circular_correlation(c, a)
+
+        a[:] = np.random.randn(50)  # Same array object, new key
+        second = circular_correlation(c, a)
+
+        assert not np.allclose(first, second)
+        assert np.allclose(second, circular_correlation_batch(c[None, :], a)[0])
+
 
 class TestSuperposition:
     """Test superposition (vector addition) operation."""
@@ -377,6 +423,219 @@ class TestSemanticVocabulary:
         self_similarity = vocab.similarity("A", "A")
         assert np.abs(self_similarity - 1.0) < 0.01
 
+    @pytest.mark.parametrize("dim", [50, 256])
+    def test_bind_uses_cached_operators(self, dim):
+        """Test that bind/unbind (circulant and FFT paths) match the FFT functions."""
+        vocab = SemanticVocabulary(dimensionality=dim)
+        vocab.add("A")
+        vocab.add("B")
+
+        bound = vocab.bind("A", "B", "AB")
+        assert np.allclose(bound, circular_convolution(vocab.get("A"), vocab.get("B")), atol=1e-6)
+
+        recovered = vocab.unbind("AB", "B", "A_RECOVERED")
+        assert np.allclose(recovered, circular_correlation(bound, vocab.get("B")), atol=1e-6)
+        # Spectra are computed lazily, only on the FFT path
+        assert ("AB" in vocab._fft_cache) == (dim >= vocab.CIRCULANT_MAX_DIM)
+
+        vocab.bind("B", "A", "AB")  # Overwrite drops the stale spectrum
+        assert "AB" not in vocab._fft_cache
+        np.testing.assert_allclose(
+            vocab._spectrum("AB"), np.fft.rfft(vocab.get("AB")), atol=1e-5
+        )
+
+        with pytest.raises(KeyError):
+            vocab.bind("A", "MISSING", "X")
+
+    def test_circulant_cache_invalidated(self):
+        """Test that overwriting a pointer drops its cached circulant."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("A")
+        vocab.add("B")
+        vocab.add("C")
+
+        vocab.bind("A", "B", "AB")
+        vocab.bind("A", "C", "B")  # Overwrites B, which was used as a key
+        bound = vocab.bind("A", "B", "AB")
+
+        expected = circular_convolution(vocab.get("A"), vocab.get("B"))
+        assert np.allclose(bound, expected, atol=1e-6)
+
+    def test_conj_spectrum_cache_invalidated(self):
+        """Test that overwriting an unbinding key drops its cached conjugate spectrum."""
+        vocab = SemanticVocabulary(dimensionality=256)
+        vocab.add("A")
+        vocab.add("B")
+        vocab.add("C")
+        vocab.bind("A", "B", "AB")
+
+        vocab.unbind("AB", "B", "R")
+        vocab.bind("A", "C", "B")  # Overwrites the key
+        recovered = vocab.unbind("AB", "B", "R")
+
+        expected = circular_correlation(vocab.get("AB"), vocab.get("B"))
+        assert np.allclose(recovered, expected, atol=1e-6)
+
+    def test_dtype(self):
+        """Test that vectors and binding results keep the vocabulary dtype."""
+        vocab = SemanticVocabulary(dimensionality=256)
+        vocab.add("A")
+        vocab.add("B")
+        assert vocab.get("A").dtype == np.float32
+        assert vocab.bind("A", "B", "AB").dtype == np.float32
+        assert circular_convolution(vocab.get("A"), vocab.get("B")).dtype == np.float32
+
+        vocab64 = SemanticVocabulary(dimensionality=50, dtype=np.float64)
+        vocab64.add("A")
+        vocab64.add("B")
+        assert vocab64.bind("A", "B", "AB").dtype == np.float64
+
+    def test_similarity_all(self):
+        """Test that similarity_all scores every pointer, across matrix growth."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        names = [f"V{i}" for i in range(40)]  # More than the initial capacity
+        for name in names:
+            vocab.add(name)
+
+        scores = vocab.similarity_all(vocab.get("V3"))
+
+        assert list(scores) == names
+        assert scores["V3"] == pytest.approx(1.0, abs=1e-5)
+        for name in names:
+            assert scores[name] == pytest.approx(vocab.similarity("V3", name), abs=1e-5)
+            assert np.shares_memory(vocab.vectors[name], vocab._matrix)
+
+        with pytest.raises(ValueError):
+            vocab.similarity_all(np.zeros(40))
+
+    def test_matrix(self):
+        """Test the stacked read-only view of the vocabulary."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("A")
+        vocab.add("B")
+
+        matrix = vocab.matrix
+
+        assert matrix.shape == (2, 50)
+        assert matrix.flags.c_contiguous
+        np.testing.assert_array_equal(matrix[1], vocab.get("B"))
+        with pytest.raises(ValueError):
+            matrix[0] = 0.0
+        vocab.add("C", np.ones(50))  # Vocabulary storage stays writable
+
+    def test_overwritten_result_keeps_earlier_results(self):
+        """Test that overwriting a result name leaves returned arrays intact."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        for name in ["A", "B", "C"]:
+            vocab.add(name)
+
+        r1 = vocab.bind("A", "B", "R")
+        saved = r1.copy()
+        r2 = vocab.bind("A", "C", "R")
+
+        np.testing.assert_array_equal(r1, saved)
+        assert not np.shares_memory(r1, r2)
+        np.testing.assert_array_equal(vocab.get("R"), r2)
+
+        view = vocab.get("R")
+        assert not view.flags.writeable
+        with pytest.raises(ValueError):
+            view[0] = 0.0
+
+    def test_best_match(self):
+        """Test top-k matching against the whole vocabulary."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        for name in ["A", "B", "C", "D"]:
+            vocab.add(name)
+        query = vocab.get("C") + 0.5 * vocab.get("A")
+
+        matches = vocab.best_match(query, top_k=2)
+
+        assert [name for name, _ in matches] == ["C", "A"]
+        assert matches[0][1] == pytest.approx(float(np.dot(vocab.get("C"), query)), abs=1e-5)
+        assert len(vocab.best_match(query, top_k=10)) == 4
+
+        with pytest.raises(ValueError):
+            vocab.best_match(query, top_k=0)
+
+    def test_best_match_empty_vocabulary(self):
+        """Test that matching against an empty vocabulary raises clearly."""
+        vocab = SemanticVocabulary(dimensionality=50)
+
+        with pytest.raises(ValueError, match="empty vocabulary"):
+            vocab.best_match(np.ones(50))
+
+    def test_similarity_matrix(self):
+        """Test pairwise similarities between two vocabularies."""
+        vocab_a = SemanticVocabulary(dimensionality=50)
+        vocab_b = SemanticVocabulary(dimensionality=50)
+        for name in ["A", "B", "C"]:
+            vocab_a.add(name)
+        for name in ["X", "Y"]:
+            vocab_b.add(name)
+
+        sims = vocab_a.similarity_matrix(vocab_b)
+
+        assert sims.shape == (3, 2)
+        assert sims[1, 0] == pytest.approx(cosine_similarity(vocab_a.get("B"), vocab_b.get("X")), abs=1e-5)
+
+        with pytest.raises(ValueError):
+            vocab_a.similarity_matrix(SemanticVocabulary(dimensionality=40))
+
+    def test_add_many(self):
+        """Test bulk creation of random semantic pointers."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("A")
+        names = [f"V{i}" for i in range(40)]  # Forces the matrix to grow
+
+        vectors = vocab.add_many(names, rng=np.random.default_rng(0))
+
+        assert vectors.shape == (40, 50)
+        assert len(vocab) == 41
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_array_equal(vocab.get("V7"), vectors[7])
+        np.testing.assert_allclose(vocab.bind("V0", "V1", "B"),
+                                   circular_convolution(vectors[0], vectors[1]), atol=1e-5)
+
+        again = SemanticVocabulary(dimensionality=50).add_many(names, rng=np.random.default_rng(0))
+        np.testing.assert_array_equal(again, vectors)
+
+        with pytest.raises(ValueError):
+            vocab.add_many(["NEW", "A"])
+        with pytest.raises(ValueError):
+            vocab.add_many(["X", "X"])
+
+    def test_backend(self):
+        """Test backend selection and the host/device conversion helpers."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("A")
+
+        assert vocab.backend == "numpy"
+        np.testing.assert_array_equal(vocab.to_device(), vocab.get("A")[None, :])
+        assert isinstance(SemanticVocabulary.to_host(vocab.to_device()), np.ndarray)
+
+        with pytest.raises(ValueError):
+            SemanticVocabulary(dimensionality=50, backend="opencl")
+
+    @pytest.mark.skipif(HAVE_CUPY, reason="CuPy is installed")
+    def test_cupy_backend_requires_cupy(self):
+        """Test that the cupy backend fails loudly without CuPy."""
+        with pytest.raises(ImportError):
+            SemanticVocabulary(dimensionality=50, backend="cupy")
+
+    def test_bind_many(self):
+        """Test batched binding stores the same results as bind."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        for name in ["COLOR", "RED", "SHAPE", "CIRCLE"]:
+            vocab.add(name)
+
+        results = vocab.bind_many([("COLOR", "RED", "C_R"), ("SHAPE", "CIRCLE", "S_C")])
+
+        assert results.shape == (2, 50)
+        assert np.allclose(vocab.get("C_R"), results[0])
+        expected = circular_convolution(vocab.get("SHAPE"), vocab.get("CIRCLE"))
+        assert np.allclose(vocab.get("S_C"), expected, atol=1e-6)
+
     def test_contains(self):
         """Test __contains__ method."""
         vocab = SemanticVocabulary(dimensionality=50)
@@ -470,6 +729,17 @@ class TestNeuralEncoder:
         # Bias should shift firing rates up
         assert np.mean(rates_bias) > np.mean(rates_default)
 
+    def test_encode_into_buffer(self):
+        """Test encoding into a preallocated output buffer."""
+        encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        sp = np.random.randn(50) / np.sqrt(50)
+        out = np.empty(40, dtype=encoder.dtype)
+
+        result = encoder.encode(sp, gain=2.0, bias=0.1, out=out)
+
+        assert result is out
+        assert np.allclose(out, np.maximum(0, 2.0 * (encoder.encoders @ sp) + 0.1), atol=1e-6)
+
     def test_encode_wrong_dimension(self):
         """Test that wrong dimension raises ValueError."""
         encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50)
@@ -515,6 +785,56 @@ class TestNeuralEncoder:
         with pytest.raises(ValueError, match="Expected"):
             encoder.decode(wrong_rates)
 
+    def test_decoder_disk_cache(self, tmp_path, monkeypatch):
+        """Test that decoders are persisted and reused for identical encoders."""
+        first = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42, cache_dir=str(tmp_path))
+        decoders = first.decoders
+        assert len(list(tmp_path.glob("decoders_*.npy"))) == 1
+
+        second = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42, cache_dir=str(tmp_path))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("decoders should come from the cache")
+
+        monkeypatch.setattr(second, "_compute_decoders", fail)
+        np.testing.assert_array_equal(second.decoders, decoders)
+
+        other = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=7, cache_dir=str(tmp_path))
+        other.decoders
+        assert len(list(tmp_path.glob("decoders_*.npy"))) == 2
+
+    def test_encode_batch_matches_encode(self):
+        """Test batched encoding matches per-vector encoding."""
+        encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        batch = np.random.randn(3, 50)
+
+        rates = encoder.encode_batch(batch, gain=2.0, bias=0.1)
+
+        assert rates.shape == (3, 40)
+        for row, sp in zip(rates, batch):
+            assert np.allclose(row, encoder.encode(sp, gain=2.0, bias=0.1))
+
+    def test_decode_batch_matches_decode(self):
+        """Test batched decoding matches per-vector decoding."""
+        encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        rates = encoder.encode_batch(np.random.randn(3, 50))
+
+        recovered = encoder.decode_batch(rates)
+
+        assert recovered.shape == (3, 50)
+        for row, r in zip(recovered, rates):
+            assert np.allclose(row, encoder.decode(r))
+
+    def test_batch_wrong_shape(self):
+        """Test batched encode/decode reject wrongly shaped input."""
+        encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50)
+
+        with pytest.raises(ValueError):
+            encoder.encode_batch(np.random.randn(3, 30))
+
+        with pytest.raises(ValueError):
+            encoder.decode_batch(np.random.randn(40))
+
     def test_decoders_computed_lazily(self):
         """Test that decoders are computed on first access."""
         encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
@@ -631,27 +951,116 @@ class TestSemanticWeightGenerator:
         with pytest.raises(ValueError, match="Vector dimension"):
             gen.unbinding_weights(wrong_vector)
 
-    def test_circular_conv_matrix_shape(self):
-        """Test that circular convolution matrix has correct shape."""
+    def test_binding_weights_match_circulant(self):
+        """Test binding/unbinding weights equal the explicit circulant transforms."""
+        enc_src = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        enc_tgt = NeuralEncoder(n_neurons=30, sp_dimensionality=50, seed=43)
+        gen = SemanticWeightGenerator(enc_src, enc_tgt)
+
+        v = np.random.randn(50) / np.sqrt(50)
+        # conv[:, j] = roll(v, j), so conv @ x == v ⊛ x (unnormalized)
+        conv = np.stack([np.roll(v, j) for j in range(50)], axis=1)
+        x = np.random.randn(50)
+        assert np.allclose(conv @ x, np.fft.irfft(np.fft.rfft(v) * np.fft.rfft(x), n=50))
+
+        expected_bind = enc_tgt.encoders @ conv @ enc_src.decoders
+        expected_unbind = enc_tgt.encoders @ conv.T @ enc_src.decoders
+
+        # Weights are computed in single precision
+        assert np.allclose(gen.binding_weights(v), expected_bind, atol=1e-6)
+        assert np.allclose(gen.unbinding_weights(v), expected_unbind, atol=1e-6)
+
+    def test_precomputed_dft_reused(self):
+        """Test that precomputed spectra give the same weights as vectors."""
+        enc_src = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        enc_tgt = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=43)
+        gen = SemanticWeightGenerator(enc_src, enc_tgt)
+
+        v = np.random.randn(50) / np.sqrt(50)
+        dft = gen.precompute_dft(v)
+
+        assert np.allclose(gen.binding_weights(dft=dft), gen.binding_weights(v))
+        assert np.allclose(gen.unbinding_weights(dft=dft), gen.unbinding_weights(v))
+
+        with pytest.raises(ValueError):
+            gen.binding_weights()
+
+    def test_dtype(self):
+        """Test that encoders, decoders, rates and weights are single precision."""
+        enc_src = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        enc_tgt = NeuralEncoder(n_neurons=30, sp_dimensionality=50, seed=43)
+        gen = SemanticWeightGenerator(enc_src, enc_tgt)
+        v = np.random.randn(50)
+
+        assert enc_src.encoders.dtype == np.float32
+        assert enc_src.decoders.dtype == np.float32
+        assert enc_src.encode(v).dtype == np.float32
+        assert gen.binding_weights(v).dtype == np.float32
+
+        enc64 = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42, dtype=np.float64)
+        assert enc64.decoders.dtype == np.float64
+
+    def test_weights_cached_by_vector(self):
+        """Test that weights for the same vector are computed once and shared."""
+        enc_src = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        enc_tgt = NeuralEncoder(n_neurons=30, sp_dimensionality=50, seed=43)
+        gen = SemanticWeightGenerator(enc_src, enc_tgt)
+        v = np.random.randn(50)
+
+        W = gen.binding_weights(v)
+
+        assert gen.binding_weights(v.copy()) is W
+        assert gen.unbinding_weights(v) is not W
+        assert not W.flags.writeable
+        assert gen.binding_weights(np.random.randn(50)) is not W
+
+        for _ in range(SemanticWeightGenerator.WEIGHT_CACHE_SIZE):
+            gen.binding_weights(np.random.randn(50))
+        assert gen.binding_weights(v) is not W  # Evicted, recomputed
+        assert np.array_equal(gen.binding_weights(v), W)
+
+    def test_identity_weights_cached(self):
+        """Test that identity weights are computed once and returned read-only."""
+        enc_src = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        enc_tgt = NeuralEncoder(n_neurons=30, sp_dimensionality=50, seed=43)
+        gen = SemanticWeightGenerator(enc_src, enc_tgt)
+
+        W = gen.identity_weights()
+
+        assert gen.identity_weights() is W
+        assert not W.flags.writeable
+        np.testing.assert_allclose(W, enc_tgt.encoders @ enc_src.decoders)
+
+    def test_matrices_aligned(self):
+        """Test that encoders, decoders and cleanup weights start 64-byte aligned."""
+        encoder = NeuralEncoder(n_neurons=40, sp_dimensionality=50, seed=42)
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("A")
+        cleanup = CleanupMemory(vocab)
+
+        for matrix in (encoder.encoders, encoder.decoders, cleanup.weights):
+            assert matrix.ctypes.data % 64 == 0
+            assert matrix.flags.c_contiguous
+
+    def test_apply_spectrum_shape(self):
+        """Test that the frequency-domain transform keeps the decoder shape."""
         enc_src = NeuralEncoder(n_neurons=40, sp_dimensionality=50)
         enc_tgt = NeuralEncoder(n_neurons=40, sp_dimensionality=50)
         gen = SemanticWeightGenerator(enc_src, enc_tgt)
 
-        vector = np.random.randn(50)
-        matrix = gen._circular_conv_matrix(vector)
+        spectrum = np.fft.rfft(np.random.randn(50))
+        transformed = gen._apply_spectrum(spectrum)
 
-        assert matrix.shape == (50, 50)
+        assert transformed.shape == (50, 40)
 
-    def test_circular_corr_matrix_shape(self):
-        """Test that circular correlation matrix has correct shape."""
+    def test_apply_spectrum_wrong_length(self):
+        """Test that a spectrum of the wrong length raises ValueError."""
         enc_src = NeuralEncoder(n_neurons=40, sp_dimensionality=50)
         enc_tgt = NeuralEncoder(n_neurons=40, sp_dimensionality=50)
         gen = SemanticWeightGenerator(enc_src, enc_tgt)
 
-        vector = np.random.randn(50)
-        matrix = gen._circular_corr_matrix(vector)
-
-        assert matrix.shape == (50, 50)
+        with pytest.raises(ValueError, match="Spectrum length"):
+            gen._apply_spectrum(np.fft.rfft(np.random.randn(40)))
 
     def test_repr(self):
         """Test __repr__ method."""
@@ -814,6 +1223,18 @@ class TestCleanupMemory:
 
         assert np.allclose(W, expected)
 
+    def test_weight_matrix_matches_outer_products(self):
+        """Test the stacked-vocabulary weights against summed outer products."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        for i in range(20):  # More rows than the initial matrix capacity
+            vocab.add(f"C{i}")
+
+        W = CleanupMemory(vocab).get_weights()
+
+        expected = sum(np.outer(v, v) for v in vocab.vectors.values())
+        np.fill_diagonal(expected, 0)
+        assert np.allclose(W, expected, atol=1e-5)
+
     def test_cleanup_reduces_noise(self):
         """Test cleanup improves similarity to original vector."""
         np.random.seed(42)
@@ -977,13 +1398,138 @@ class TestCleanupMemory:
 
         cleaned, trajectory, n_iters = result_with_traj
         assert isinstance(cleaned, np.ndarray)
-        assert isinstance(trajectory, list)
+        assert isinstance(trajectory, np.ndarray)
+        assert trajectory.shape == (n_iters + 1, 50)
         assert isinstance(n_iters, int)
 
         # Without trajectory
         result_without_traj = cleanup.cleanup(noisy, return_trajectory=False)
         assert isinstance(result_without_traj, np.ndarray)
         assert result_without_traj.shape == (50,)
+        assert np.allclose(result_without_traj, cleaned, atol=1e-6)
+
+    def test_cleanup_batch_matches_single(self):
+        """Test batched cleanup matches per-vector cleanup row by row."""
+        np.random.seed(42)
+        vocab = SemanticVocabulary(dimensionality=50)
+        for name in ["V1", "V2", "V3", "V4"]:
+            vocab.add(name)
+
+        cleanup = CleanupMemory(vocab)
+
+        noisy = np.stack([vocab.get(name) for name in vocab.vectors])
+        noisy = noisy + 0.5 * np.random.randn(*noisy.shape)
+        noisy = noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+        cleaned = cleanup.cleanup_batch(noisy)
+
+        assert cleaned.shape == noisy.shape
+        for row, vec in zip(cleaned, noisy):
+            assert np.allclose(row, cleanup.cleanup(vec), atol=1e-6)
+
+    def test_cleanup_batch_casts_input(self):
+        """Test that batches settle in the weights' dtype, even from integers."""
+        np.random.seed(0)
+        vocab = SemanticVocabulary(dimensionality=50)
+        for name in ["V1", "V2"]:
+            vocab.add(name)
+        cleanup = CleanupMemory(vocab)
+
+        noisy = np.sign(np.stack([vocab.get("V1"), vocab.get("V2")])).astype(np.int64)
+        cleaned = cleanup.cleanup_batch(noisy)
+
+        assert cleaned.dtype == cleanup.weights.dtype
+        assert np.all(np.linalg.norm(cleaned, axis=1) > 0.5)
+        for row, vec in zip(cleaned, noisy):
+            assert np.allclose(row, cleanup.cleanup(vec), atol=1e-6)
+
+    def test_find_nearest_match_batch(self):
+        """Test batched nearest match agrees with find_nearest_match."""
+        np.random.seed(42)
+        vocab = SemanticVocabulary(dimensionality=50)
+        for name in ["CAT", "DOG", "BIRD"]:
+            vocab.add(name)
+
+        cleanup = CleanupMemory(vocab)
+
+        queries = np.stack([vocab.get("BIRD"), vocab.get("CAT")])
+        queries = queries + 0.1 * np.random.randn(*queries.shape)
+
+        names, similarities = cleanup.find_nearest_match_batch(queries)
+
+        assert names == ["BIRD", "CAT"]
+        for query, name, sim in zip(queries, names, similarities):
+            assert (name, pytest.approx(sim)) == cleanup.find_nearest_match(query)
+
+    def test_find_nearest_match_tracks_vocabulary(self):
+        """Test that nearest-match scores are cosines and follow vocabulary updates."""
+        np.random.seed(42)
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("CAT")
+        vocab.add("DOG")
+        cleanup = CleanupMemory(vocab)
+
+        name, similarity = cleanup.find_nearest_match(3.0 * vocab.get("DOG"))
+        assert name == "DOG"
+        assert similarity == pytest.approx(1.0, abs=1e-5)
+
+        version = vocab.version
+        vocab.add("BIRD")
+        assert vocab.version > version
+        assert cleanup.find_nearest_match(vocab.get("BIRD"))[0] == "BIRD"
+
+    def test_version_records_vocabulary_state(self):
+        """Test that version marks when the attractors have gone stale."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("CAT")
+        cleanup = CleanupMemory(vocab)
+        assert cleanup.version == vocab.version
+
+        vocab.add("DOG")
+        assert cleanup.version != vocab.version
+        assert CleanupMemory(vocab).version == vocab.version
+
+    @pytest.mark.skipif(not HAVE_JAX, reason="JAX is not installed")
+    def test_cleanup_batch_jax_matches_numpy(self):
+        """Test the JAX settling loop against the NumPy batch path."""
+        np.random.seed(42)
+        vocab = SemanticVocabulary(dimensionality=50)
+        for name in ["CAT", "DOG", "BIRD"]:
+            vocab.add(name)
+        cleanup = CleanupMemory(vocab)
+        noisy = np.stack([vocab.get(name) for name in ["CAT", "DOG", "BIRD"]])
+        noisy = noisy + 0.3 * np.random.randn(*noisy.shape)
+
+        expected = cleanup.cleanup_batch(noisy)
+        result = cleanup.cleanup_batch(noisy, backend="jax")
+
+        assert np.allclose(result, expected, atol=1e-4)
+
+    def test_cleanup_batch_backend(self):
+        """Test backend validation for batched cleanup."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("A")
+        cleanup = CleanupMemory(vocab)
+        noisy = np.random.randn(2, 50)
+
+        with pytest.raises(ValueError, match="Unknown backend"):
+            cleanup.cleanup_batch(noisy, backend="torch")
+        if not HAVE_JAX:
+            with pytest.raises(ImportError):
+                cleanup.cleanup_batch(noisy, backend="jax")
+
+    def test_batch_dimension_mismatch(self):
+        """Test batched methods reject wrongly shaped input."""
+        vocab = SemanticVocabulary(dimensionality=50)
+        vocab.add("TEST")
+
+        cleanup = CleanupMemory(vocab)
+
+        with pytest.raises(ValueError, match="dimension"):
+            cleanup.cleanup_batch(np.random.randn(3, 30))
+
+        with pytest.raises(ValueError, match="dimension"):
+            cleanup.find_nearest_match_batch(np.random.randn(50))
 
     def test_cleanup_with_single_vector(self):
         """Test cleanup works with vocabulary of single vector."""